@@ -296,6 +296,10 @@ class DataManager:
         self.today_reports_folder = config.DATA_FOLDER
         self.safe_logger = SafeLogger('DataManager')
         self.is_shutting_down = False
+        # Normalized records and their ticket lookup, reused while the CSV is unchanged
+        self._filter_cache_key = None
+        self._filter_records = []
+        self._by_ticket = {}
         # CRITICAL FIX: Initialize these attributes with safe defaults FIRST
         self.today_json_folder = None
         self.today_pdf_folder = None
@@ -550,22 +554,12 @@ class DataManager:
             # Simple retry logic without complex context managers
             for attempt in range(3):
                 try:
-                    all_records = []
+                    all_records = self._load_filter_records(current_file)
                     
-                    # Read all data at once with simple file handling
-                    with open(current_file, 'r', newline='', encoding='utf-8', errors='replace') as csv_file:
-                        reader = csv.DictReader(csv_file)
-                        raw_records = list(reader)  # Read everything immediately
-                    
-                    # Normalize all records to handle both header formats
-                    all_records = [self.normalize_record_keys(record) for record in raw_records]
-                    
-                    self._safe_data_log("info", f"Successfully loaded {len(all_records)} records")
-                    
-                    # Filter outside of file operations
+                    # Filter outside of file operations; callers get copies so edits can't reach the cache
                     if not filter_text:
                         self._safe_data_log("info", f"Returning all {len(all_records)} records (no filter)")
-                        return all_records
+                        return [dict(record) for record in all_records]
                     
                     filter_text = filter_text.lower().strip()
                     filtered_records = []
@@ -576,12 +570,12 @@ class DataManager:
                             ticket_no = record.get('ticket_no', '').strip()
                             if ticket_no and ticket_no.lower() == filter_text:
                                 print(f"🔍 DEBUG: Found exact ticket match: {ticket_no} (searched for {filter_text})")
-                                filtered_records.append(record)
+                                filtered_records.append(dict(record))
                                 continue
                             
                             # General case: Check if filter text exists in any field (case-insensitive)
                             if any(filter_text in str(value).lower() for value in record.values() if value is not None):
-                                filtered_records.append(record)
+                                filtered_records.append(dict(record))
                         except Exception as filter_error:
                             self._safe_data_log("warning", f"Error filtering record: {filter_error}")
                             continue
@@ -608,6 +602,35 @@ class DataManager:
             self._safe_data_log("error", f"Error in get_filtered_records: {e}")
             return []
 
+    def _load_filter_records(self, current_file):
+        """Return the normalized records of the CSV, re-reading only when the file changes
+        
+        Args:
+            current_file: Path of the CSV data file
+            
+        Returns:
+            list: Normalized records. They are the cache itself - copy any record before handing it out.
+        """
+        file_stat = os.stat(current_file)
+        cache_key = (current_file, file_stat.st_mtime_ns, file_stat.st_size)
+        if cache_key == self._filter_cache_key:
+            return self._filter_records
+        
+        # Read all data at once with simple file handling
+        with open(current_file, 'r', newline='', encoding='utf-8', errors='replace') as csv_file:
+            reader = csv.DictReader(csv_file)
+            raw_records = list(reader)  # Read everything immediately
+        
+        # Normalize all records to handle both header formats
+        all_records = [self.normalize_record_keys(record) for record in raw_records]
+        
+        self._filter_records = all_records
+        self._by_ticket = {record.get('ticket_no', ''): record for record in all_records}
+        self._filter_cache_key = cache_key
+        
+        self._safe_data_log("info", f"Successfully loaded {len(all_records)} records")
+        return all_records
+
  
                     
     def _setup_fallback_folders(self):
@@ -2166,6 +2189,28 @@ GENERATED BY: Swaccha Andhra Corporation Weighbridge System
         success, _, _ = self.save_to_cloud_with_images(data)
         return success
 
+    def get_record_by_ticket(self, ticket_no):
+        """Get a specific record by ticket number
+        
+        Args:
+            ticket_no: Ticket number to look up
+            
+        Returns:
+            dict: Record as dictionary or None if not found
+        """
+        current_file = self.get_current_data_file()
+        
+        if not os.path.exists(current_file):
+            return None
+            
+        try:
+            self._load_filter_records(current_file)
+            record = self._by_ticket.get(ticket_no)
+            return dict(record) if record is not None else None
+        except Exception as e:
+            print(f"Error finding record: {e}")
+            return None
+    
     def get_record_by_vehicle(self, vehicle_no):
         """Get a specific record by vehicle number
         
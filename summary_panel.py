@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 import datetime
+import logging
+from collections import OrderedDict
 from PIL import Image, ImageTk
 import cv2
 
@@ -9,6 +11,40 @@ import config
 from ui_components import HoverButton
 from reports import ReportGenerator  # Import the new report generator
 
+logger = logging.getLogger(__name__)
+
+# Status column text keyed by (recency indicator, complete) - built once, not per row
+_STATUS_STRINGS = {
+    (indicator, complete): f"{indicator}{'Complete' if complete else 'Incomplete'}"
+    for indicator in ("🟢 ", "🟡 ", "")
+    for complete in (True, False)
+}
+
+# Decoded + resized thumbnails keyed by (path, mtime, width, height).
+# PIL images are cached rather than PhotoImages, which are bound to a Tk widget.
+_thumb_cache = OrderedDict()
+_THUMB_CACHE_MAXSIZE = 64
+
+
+def _get_thumbnail(image_path, width, height):
+    """Return a resized PIL image for image_path, decoding only on cache miss"""
+    key = (image_path, os.path.getmtime(image_path), width, height)
+    thumb = _thumb_cache.get(key)
+    if thumb is not None:
+        _thumb_cache.move_to_end(key)
+        return thumb
+    
+    img = cv2.imread(image_path)
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img = cv2.resize(img, (width, height))
+    thumb = Image.fromarray(img)
+    
+    _thumb_cache[key] = thumb
+    if len(_thumb_cache) > _THUMB_CACHE_MAXSIZE:
+        _thumb_cache.popitem(last=False)
+    return thumb
+
+
 class SummaryPanel:
     """Panel for displaying summary of recent entries"""
     
@@ -25,6 +61,9 @@ class SummaryPanel:
         # Create summary variables
         self.filter_var = tk.StringVar()
         
+        # Report generator shared by the quick export buttons (created on first use)
+        self._report_generator = None
+        
         # Create UI
         self.create_panel()
         
@@ -78,7 +117,7 @@ class SummaryPanel:
         summary_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
         # Create treeview for table
-        columns = ("date", "vehicle", "ticket", "agency", "material", "first_weight", "second_weight", "net_weight", "images")
+        columns = ("date", "vehicle", "ticket", "agency", "material", "first_weight", "second_weight", "net_weight", "status", "images")
         self.summary_tree = ttk.Treeview(summary_frame, columns=columns, show="headings", height=10)
         
         # Define column headings
@@ -90,6 +129,7 @@ class SummaryPanel:
         self.summary_tree.heading("first_weight", text="First Weight")
         self.summary_tree.heading("second_weight", text="Second Weight")
         self.summary_tree.heading("net_weight", text="Net Weight")
+        self.summary_tree.heading("status", text="Status")
         self.summary_tree.heading("images", text="Images")
         
         # Define column widths
@@ -101,8 +141,13 @@ class SummaryPanel:
         self.summary_tree.column("first_weight", width=80)
         self.summary_tree.column("second_weight", width=80)
         self.summary_tree.column("net_weight", width=70)
+        self.summary_tree.column("status", width=90)
         self.summary_tree.column("images", width=50)
         
+        # Row color tags are configured once; rows pick them up at insert time
+        self.summary_tree.tag_configure("evenrow", background=config.COLORS["table_row_even"])
+        self.summary_tree.tag_configure("oddrow", background=config.COLORS["table_row_odd"])
+        
         # Add scrollbar
         summary_scrollbar = ttk.Scrollbar(summary_frame, orient=tk.VERTICAL, command=self.summary_tree.yview)
         self.summary_tree.configure(yscroll=summary_scrollbar.set)
@@ -135,22 +180,10 @@ class SummaryPanel:
     
 
     
-    def _apply_row_colors(self):
-        """Apply alternating row colors to treeview"""
-        for i, item in enumerate(self.summary_tree.get_children()):
-            if i % 2 == 0:
-                self.summary_tree.item(item, tags=("evenrow",))
-            else:
-                self.summary_tree.item(item, tags=("oddrow",))
-        
-        self.summary_tree.tag_configure("evenrow", background=config.COLORS["table_row_even"])
-        self.summary_tree.tag_configure("oddrow", background=config.COLORS["table_row_odd"])
-    
     def update_summary(self):
         """Update the summary tree with recent records - ENHANCED with descending time order"""
-        # Clear existing items
-        for item in self.summary_tree.get_children():
-            self.summary_tree.delete(item)
+        # Clear existing items in a single Tk call
+        self.summary_tree.delete(*self.summary_tree.get_children())
             
         if not self.data_manager:
             return
@@ -159,7 +192,7 @@ class SummaryPanel:
         filter_text = self.filter_var.get()
         records = self.data_manager.get_filtered_records(filter_text)
         
-        print(f"🔍 SUMMARY DEBUG: Retrieved {len(records)} records for display")
+        logger.debug("SUMMARY: retrieved %d records for display", len(records))
         
         # ENHANCED: Sort records by date and time in descending order (most recent first)
         try:
@@ -195,21 +228,17 @@ class SummaryPanel:
                         return datetime.datetime.min
                         
                 except (ValueError, TypeError) as e:
-                    print(f"⚠️  Date parsing error for record: {e}")
+                    logger.debug("SUMMARY: date parsing error for record: %s", e)
                     return datetime.datetime.min
             
             # Sort records by datetime in descending order (most recent first)
             sorted_records = sorted(records, key=get_datetime_for_sorting, reverse=True)
             
-            print(f"📅 SORT DEBUG: Sorted {len(sorted_records)} records by date/time (descending)")
-            
             # Show most recent first (limited to 300 for performance)
             recent_records = sorted_records[:300] if len(sorted_records) > 300 else sorted_records
             
-            print(f"📊 DISPLAY DEBUG: Showing {len(recent_records)} most recent records")
-            
         except Exception as e:
-            print(f"❌ SORT ERROR: {e} - falling back to original order")
+            logger.debug("SUMMARY: sort failed (%s) - falling back to original order", e)
             # Fallback to original logic if sorting fails
             recent_records = records[-300:] if len(records) > 300 else records
             recent_records.reverse()  # Most recent first
@@ -231,11 +260,8 @@ class SummaryPanel:
                 second_weight = record.get('Second Weight', '') or record.get('second_weight', '')
                 net_weight = record.get('Net Weight', '') or record.get('net_weight', '')
                 
-                # ENHANCED: Format datetime display for better readability
-                datetime_display = f"{date}"
-                if time:
-                    # Show time in 24-hour format
-                    datetime_display = f"{date} {time}"
+                # ENHANCED: Format datetime display for better readability (24-hour time)
+                datetime_display = f"{date} {time}" if time else date
                 
                 # Count images (simplified)
                 image_count = 0
@@ -245,7 +271,7 @@ class SummaryPanel:
                         image_count += 1
                 
                 # Status based on weights
-                status = "Complete" if (first_weight and second_weight) else "Incomplete"
+                is_complete = bool(first_weight and second_weight)
                 
                 # ENHANCED: Add visual indicators for recent records
                 status_indicator = ""
@@ -255,35 +281,40 @@ class SummaryPanel:
                     status_indicator = "🟡 "  # Yellow dot for recent
                 
                 # Insert into tree with enhanced datetime display
-                self.summary_tree.insert("", "end", values=(
-                    ticket,
+                self.summary_tree.insert("", "end", tags=("evenrow" if i % 2 == 0 else "oddrow",), values=(
                     datetime_display,  # ENHANCED: Shows both date and time
                     vehicle,
+                    ticket,
                     agency,
                     material,
                     first_weight,
                     second_weight,
                     net_weight,
-                    f"{status_indicator}{status}",  # ENHANCED: Visual status indicator
+                    _STATUS_STRINGS[(status_indicator, is_complete)],  # ENHANCED: Visual status indicator
                     image_count
                 ))
                 
             except Exception as e:
-                print(f"❌ Error displaying record {i}: {e}")
+                logger.debug("SUMMARY: error displaying record %d: %s", i, e)
                 continue
         
-        # Apply row colors
-        self._apply_row_colors()
-        
-        print(f"✅ SUMMARY UPDATE: Displayed {len(recent_records)} records in descending time order")
+        logger.debug("SUMMARY: displayed %d records in descending time order", len(recent_records))
 
 
 
     def apply_filter(self, *args):
         """Apply filter and refresh display - FIXED"""
-        print(f"🔍 SUMMARY DEBUG: Applying filter: '{self.filter_var.get()}'")
         self.update_summary()
     
+    def _get_generator(self):
+        """Return the report generator used for quick exports, creating it on first use"""
+        if self._report_generator is None:
+            self._report_generator = ReportGenerator(self.parent, self.data_manager)
+        else:
+            # Addresses may have been edited in the Advanced Reports dialog since the last export
+            self._report_generator.address_config = self._report_generator.load_address_config()
+        return self._report_generator
+    
     def export_to_excel(self):
         """Export records to Excel using new report system"""
         try:
@@ -298,8 +329,8 @@ class SummaryPanel:
                 messagebox.showwarning("No Records", "No records found to export.")
                 return
             
-            # Create report generator
-            generator = ReportGenerator(self.parent, self.data_manager)
+            # Reuse the shared report generator
+            generator = self._get_generator()
             
             # Set all records as selected for quick export
             generator.all_records = all_records
@@ -325,8 +356,8 @@ class SummaryPanel:
                 messagebox.showwarning("No Records", "No records found to export.")
                 return
             
-            # Create report generator
-            generator = ReportGenerator(self.parent, self.data_manager)
+            # Reuse the shared report generator
+            generator = self._get_generator()
             
             # Set all records as selected for quick export
             generator.all_records = all_records
@@ -359,16 +390,16 @@ class SummaryPanel:
             messagebox.showinfo("Selection", "Please select a record to view details.")
             return
         
-        # Get vehicle number from selected item
-        vehicle_no = self.summary_tree.item(selected_item, "values")[1]  # Vehicle No is index 1
+        # Get ticket number (unique per record) from selected item
+        ticket_no = self.summary_tree.item(selected_item, "values")[2]  # Ticket No is index 2
         
         # Get record from data manager
         if self.data_manager:
-            record = self.data_manager.get_record_by_vehicle(vehicle_no)
+            record = self.data_manager.get_record_by_ticket(ticket_no)
             if record:
                 self.display_record_details(record)
             else:
-                messagebox.showinfo("Not Found", f"Details for vehicle {vehicle_no} not found.")
+                messagebox.showinfo("Not Found", f"Details for ticket {ticket_no} not found.")
     
     def display_record_details(self, record):
         """Display details of a record in a popup window"""
@@ -388,10 +419,8 @@ class SummaryPanel:
         right_frame = ttk.Frame(details_frame)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Display all fields in two columns
-        # Left column
-        row = 0
-        for label, value in [
+        # Display all fields in two columns, one text widget per column
+        self._create_details_text(left_frame, [
             ("Date:", record.get('date', '')),
             ("Time:", record.get('time', '')),
             ("Site Name:", record.get('site_name', '')),
@@ -399,14 +428,9 @@ class SummaryPanel:
             ("Input Material:", record.get('material', '')),
             ("Ticket No:", record.get('ticket_no', '')),
             ("Vehicle No:", record.get('vehicle_no', ''))
-        ]:
-            ttk.Label(left_frame, text=label, font=("Segoe UI", 9, "bold")).grid(row=row, column=0, sticky=tk.W, pady=2)
-            ttk.Label(left_frame, text=value).grid(row=row, column=1, sticky=tk.W, pady=2, padx=5)
-            row += 1
-        
-        # Right column
-        row = 0
-        for label, value in [
+        ])
+        
+        self._create_details_text(right_frame, [
             ("Transfer Party:", record.get('transfer_party_name', '')),
             ("First Weight:", record.get('first_weight', '')),
             ("First Timestamp:", record.get('first_timestamp', '')),
@@ -414,10 +438,7 @@ class SummaryPanel:
             ("Second Timestamp:", record.get('second_timestamp', '')),
             ("Net Weight:", record.get('net_weight', '')),
             ("Material Type:", record.get('material_type', ''))
-        ]:
-            ttk.Label(right_frame, text=label, font=("Segoe UI", 9, "bold")).grid(row=row, column=0, sticky=tk.W, pady=2)
-            ttk.Label(right_frame, text=value).grid(row=row, column=1, sticky=tk.W, pady=2, padx=5)
-            row += 1
+        ])
         
         # Images frame
         images_frame = ttk.LabelFrame(details_window, text="Vehicle Images")
@@ -451,19 +472,35 @@ class SummaryPanel:
                                command=details_window.destroy)
         close_btn.pack(pady=5)
     
+    def _create_details_text(self, parent, fields):
+        """Render (label, value) pairs into a single read-only text widget
+        
+        Args:
+            parent: Parent widget
+            fields: List of (label, value) tuples
+        """
+        txt = tk.Text(parent, height=len(fields), width=40, relief=tk.FLAT, highlightthickness=0,
+                      bg=config.COLORS["background"], font=("Segoe UI", 9), spacing1=2, spacing3=2)
+        txt.tag_configure("bold", font=("Segoe UI", 9, "bold"))
+        
+        for label, value in fields:
+            txt.insert(tk.END, label, "bold")
+            txt.insert(tk.END, f" {value}\n")
+        
+        txt.config(state=tk.DISABLED)
+        txt.pack(fill=tk.BOTH, expand=True)
+    
     def display_image_in_frame(self, parent, image_name, width, height):
         """Display an image in the given frame with specified size"""
         if image_name:
             image_path = os.path.join(config.IMAGES_FOLDER, image_name)
             if os.path.exists(image_path):
                 try:
-                    # Read image and resize
-                    img = cv2.imread(image_path)
-                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                    img = cv2.resize(img, (width, height))
+                    # Read image and resize (cached across popups)
+                    thumb = _get_thumbnail(image_path, width, height)
                     
                     # Convert to PhotoImage
-                    photo = ImageTk.PhotoImage(image=Image.fromarray(img))
+                    photo = ImageTk.PhotoImage(image=thumb)
                     
                     # Display
                     label = tk.Label(parent, image=photo)
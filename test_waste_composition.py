@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for loading and summarizing waste CSV exports in waste_composition.py
+"""
+
+import pytest
+
+from waste_composition import WasteAnalyzer, REQUIRED_COLUMNS, POLARS_AVAILABLE
+
+PADDED_CSV = (
+    " date , material,net_weight ,other\n"
+    "2025-07-01,Plastic,100,x\n"
+    "2025-07-01,Metal,250,y\n"
+    "2025-07-02,Plastic,50,z\n"
+)
+
+
+def test_padded_headers_load(tmp_path):
+    """Headers padded with spaces still match the required columns"""
+    csv_file = tmp_path / "padded.csv"
+    csv_file.write_text(PADDED_CSV)
+
+    analyzer = WasteAnalyzer(str(csv_file))
+    assert analyzer.load_data()
+    assert list(analyzer.data.columns) == REQUIRED_COLUMNS
+    assert analyzer.data['date'].dtype.kind == 'M'
+
+    assert analyzer.filter_data_by_date('2025-07-04')
+    analyzer.calculate_cumulative_summary()
+    assert analyzer.cumulative_summary['_totals']['total_weight_kg'] == 400
+    assert analyzer.cumulative_summary['Plastic']['records'] == 2
+
+
+@pytest.mark.skipif(not POLARS_AVAILABLE, reason="polars not installed")
+def test_padded_headers_load_polars(tmp_path):
+    """The lazy polars backend matches padded headers too"""
+    csv_file = tmp_path / "padded.csv"
+    csv_file.write_text(PADDED_CSV)
+
+    analyzer = WasteAnalyzer(str(csv_file), backend='polars')
+    assert analyzer.load_data()
+    assert analyzer.filter_data_by_date('2025-07-04')
+    analyzer.calculate_cumulative_summary()
+    assert analyzer.cumulative_summary['_totals']['total_weight_kg'] == 400
+
+
+def test_missing_column_rejected(tmp_path):
+    """A CSV without net_weight fails to load instead of raising"""
+    csv_file = tmp_path / "missing.csv"
+    csv_file.write_text("date,material\n2025-07-01,Plastic\n")
+
+    assert not WasteAnalyzer(str(csv_file)).load_data()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for custom weight pattern validation in weighbridge.py
+"""
+
+import pytest
+
+from weighbridge import WeighbridgeManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """WeighbridgeManager whose log files go to a temporary folder"""
+    monkeypatch.chdir(tmp_path)
+    return WeighbridgeManager()
+
+
+def test_quantifier_chars_in_class_accepted(manager):
+    """'*' and '+' inside a character class are literals, not nested repetition"""
+    manager.update_regex_pattern(r'[*+]+(\d+)')
+    assert manager.use_custom_pattern
+    assert manager._parse_weight(b'**+1234') == 1234.0
+
+
+def test_optional_group_accepted(manager):
+    """An optional group around an unbounded repeat can't backtrack catastrophically"""
+    manager.update_regex_pattern(r'(\d+(?:\.\d+)?)\s*kg')
+    assert manager.use_custom_pattern
+
+
+@pytest.mark.parametrize('pattern', [r'(\w+\s?)+', r'(a+)+', r'(\d*){2,}'])
+def test_nested_repetition_rejected(manager, pattern):
+    """A repeated group holding an unbounded repeat is refused"""
+    manager.update_regex_pattern(pattern)
+    assert not manager.use_custom_pattern
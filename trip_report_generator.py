@@ -10,17 +10,24 @@ Created: 2025
 """
 
 import os
+import io
 import datetime
 import json
-import cv2
-from tkinter import messagebox
+import logging
+import itertools
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from PIL import Image as PILImage
 
 # Try to import required PDF libraries
 try:
     from reportlab.lib.pagesizes import A4
     from reportlab.lib import colors
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak, Frame
+    from reportlab.platypus.doctemplate import LayoutError
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.styles import ParagraphStyle
     from reportlab.lib.units import inch
     from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
     REPORTLAB_AVAILABLE = True
@@ -28,34 +35,208 @@ except ImportError:
     REPORTLAB_AVAILABLE = False
     print("ReportLab not available - PDF generation disabled")
 
+# Optional faster JSON parser/serializer for the address config
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 import config
 
+logger = logging.getLogger(__name__)
+
+# Net weight texts that are shown without a "kg" suffix
+NET_WEIGHT_PLACEHOLDERS = frozenset(("Not Available", "Unable to calculate", "Calculation Error"))
+
+# Record fields holding the 4 weighment image file names, in grid order
+IMAGE_SLOTS = ('first_front_image', 'first_back_image', 'second_front_image', 'second_back_image')
+
+# Largest size an image is prepared at for the PDF; JPEGs up to twice this are embedded as-is
+PDF_IMAGE_MAX_SIZE = (1200, 900)
+
+if REPORTLAB_AVAILABLE:
+    # Table styles are identical for every report and not mutated by doc.build, so share them
+    VEHICLE_INNER_STYLE = TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 12),
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 2),
+        ('RIGHTPADDING', (0,0), (-1,-1), 2),
+        ('TOPPADDING', (0,0), (-1,-1), 4),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ])
+    
+    WEIGHMENT_INNER_STYLE = TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 12),
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 2),
+        ('RIGHTPADDING', (0,0), (-1,-1), 2),
+        ('TOPPADDING', (0,0), (-1,-1), 4),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+        ('SPAN', (2,2), (3,2)),
+        ('ALIGN', (2,2), (3,2), 'RIGHT'),
+    ])
+    
+    # Bordered wrapper used around the vehicle and weighment tables
+    SECTION_BORDER_STYLE = TableStyle([
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('LEFTPADDING', (0,0), (-1,-1), 12),
+        ('RIGHTPADDING', (0,0), (-1,-1), 12),
+        ('TOPPADDING', (0,0), (-1,-1), 8),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ])
+    
+    IMAGES_TABLE_STYLE = TableStyle([
+        ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (1,0), 12),
+        ('FONTSIZE', (0,2), (1,2), 12),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 6),
+        ('RIGHTPADDING', (0,0), (-1,-1), 6),
+        ('TOPPADDING', (0,0), (-1,-1), 6),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 6),
+        # Header background
+        ('BACKGROUND', (0,0), (1,0), colors.lightgrey),
+        ('BACKGROUND', (0,2), (1,2), colors.lightgrey),
+    ])
+    
+    SIGNATURE_TABLE_STYLE = TableStyle([
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('FONTSIZE', (0,0), (-1,-1), 11),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+        ('TOPPADDING', (0,0), (-1,-1), 0),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+    ])
+
 
 class TripReportGenerator:
     """
     Handles individual trip report PDF generation for complete weighbridge records
     """
     
+    # Address config shared by all instances, keyed by (path, mtime) so edits are still picked up
+    _address_config = None
+    _address_config_key = None
+    
+    # Directories this process has already created
+    _dirs_ensured = set()
+    
+    # Paragraph styles, built on first use
+    _styles_cache = None
+    
+    # IMAGES_FOLDER listing (name -> path), keyed by (folder, mtime) so new captures trigger a rescan
+    _image_index = None
+    _image_index_key = None
+    
     def __init__(self):
         """Initialize the trip report generator"""
-        self.address_config = self.load_address_config()
-        
         # Ensure reports folder exists
         self.reports_folder = config.REPORTS_FOLDER
-        os.makedirs(self.reports_folder, exist_ok=True)
+        self.ensure_dir(self.reports_folder)
+        
+        self.todays_folder = None
+        self.refresh()
+    
+    def refresh(self):
+        """Pick up address config edits and roll today's subfolder over after midnight"""
+        self.address_config = self.load_address_config()
         
         # Create today's subfolder
         today = datetime.datetime.now().strftime("%Y-%m-%d")
-        self.todays_folder = os.path.join(self.reports_folder, today)
-        os.makedirs(self.todays_folder, exist_ok=True)
+        todays_folder = os.path.join(self.reports_folder, today)
+        if todays_folder != self.todays_folder:
+            self.todays_folder = todays_folder
+            self.ensure_dir(self.todays_folder)
+    
+    @classmethod
+    def ensure_dir(cls, path):
+        """Create path if needed, skipping the syscall for paths already ensured"""
+        if path not in cls._dirs_ensured:
+            os.makedirs(path, exist_ok=True)
+            cls._dirs_ensured.add(path)
+    
+    @classmethod
+    def get_image_index(cls):
+        """Map image file names in IMAGES_FOLDER to full paths, rescanning only when the folder changes
+        
+        The folder holds every capture ever taken and each weighment adds to it, so the listing
+        only pays off across a batch - single reports check their 4 files directly.
+        """
+        folder = config.IMAGES_FOLDER
+        try:
+            index_key = (folder, os.stat(folder).st_mtime_ns)
+        except OSError:
+            return {}
+        
+        if cls._image_index is None or cls._image_index_key != index_key:
+            with os.scandir(folder) as entries:
+                cls._image_index = {entry.name: entry.path for entry in entries if entry.is_file()}
+            cls._image_index_key = index_key
+        
+        return cls._image_index
+    
+    def resolve_image_path(self, image_name, image_index=None):
+        """
+        Resolve a record's image file name to an existing path
+        
+        Args:
+            image_name (str): Image file name stored in the record
+            image_index (dict, optional): Listing from get_image_index; None checks the file directly
+            
+        Returns:
+            str or None: Full path, or None if the image doesn't exist
+        """
+        if not image_name:
+            return None
+        
+        if image_index is not None:
+            image_path = image_index.get(image_name)
+            if image_path is not None:
+                return image_path
+        
+        # Direct check - single reports, or a file written after the listing was taken
+        candidate = os.path.join(config.IMAGES_FOLDER, image_name)
+        return candidate if os.path.exists(candidate) else None
     
-    def load_address_config(self):
-        """Load address configuration from JSON file"""
+    def _validate_images(self, record_data, image_index=None):
+        """
+        Resolve all 4 image slots of a record
+        
+        Args:
+            record_data (dict): Record data dictionary
+            image_index (dict, optional): Listing from get_image_index, shared across a batch
+            
+        Returns:
+            dict: {slot: path or None} for each entry of IMAGE_SLOTS
+        """
+        return {slot: self.resolve_image_path(record_data.get(slot, ''), image_index) for slot in IMAGE_SLOTS}
+    
+    @classmethod
+    def load_address_config(cls):
+        """Load address configuration from JSON file, parsing it only when it has changed"""
         try:
             config_file = os.path.join(config.DATA_FOLDER, 'address_config.json')
             if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    return json.load(f)
+                cache_key = (config_file, os.path.getmtime(config_file))
+                if cls._address_config is None or cls._address_config_key != cache_key:
+                    if ORJSON_AVAILABLE:
+                        with open(config_file, 'rb') as f:
+                            cls._address_config = orjson.loads(f.read())
+                    else:
+                        with open(config_file, 'r') as f:
+                            cls._address_config = json.load(f)
+                    cls._address_config_key = cache_key
+                return cls._address_config
             else:
                 # Create default config
                 default_config = {
@@ -88,10 +269,16 @@ class TripReportGenerator:
                 }
                 
                 # Save default config
-                os.makedirs(config.DATA_FOLDER, exist_ok=True)
-                with open(config_file, 'w') as f:
-                    json.dump(default_config, f, indent=4)
+                cls.ensure_dir(config.DATA_FOLDER)
+                if ORJSON_AVAILABLE:
+                    with open(config_file, 'wb') as f:
+                        f.write(orjson.dumps(default_config, option=orjson.OPT_INDENT_2))
+                else:
+                    with open(config_file, 'w') as f:
+                        json.dump(default_config, f, indent=4)
                 
+                cls._address_config = default_config
+                cls._address_config_key = (config_file, os.path.getmtime(config_file))
                 return default_config
         except Exception as e:
             print(f"Error loading address config: {e}")
@@ -116,23 +303,27 @@ class TripReportGenerator:
             print(f"Error checking record completeness: {e}")
             return False
     
-    def generate_trip_report_filename(self, record_data):
+    def generate_trip_report_filename(self, record_data, now=None):
         """
         Generate filename for trip report based on record data
         
         Args:
             record_data (dict): Record data dictionary
+            now (datetime, optional): Report timestamp; defaults to the current time
             
         Returns:
             str: Generated filename
         """
+        if now is None:
+            now = datetime.datetime.now()
+        
         try:
             # Get data with safe replacements
             ticket_no = record_data.get('ticket_no', 'Unknown').replace('/', '_').replace(' ', '_')
             vehicle_no = record_data.get('vehicle_no', 'Unknown').replace('/', '_').replace(' ', '_')
             site_name = record_data.get('site_name', 'Unknown').replace(' ', '_').replace('/', '_')
             agency_name = record_data.get('agency_name', 'Unknown').replace(' ', '_').replace('/', '_')
-            timestamp = datetime.datetime.now().strftime("%H%M%S")
+            timestamp = now.strftime("%H%M%S")
             
             # PDF filename format: AgencyName_SiteName_TicketNo_VehicleNo_HHMMSS.pdf
             filename = f"{agency_name}_{site_name}_{ticket_no}_{vehicle_no}_{timestamp}.pdf"
@@ -141,16 +332,18 @@ class TripReportGenerator:
             
         except Exception as e:
             print(f"Error generating filename: {e}")
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             return f"TripReport_{timestamp}.pdf"
     
-    def create_trip_report_pdf(self, record_data, save_path=None):
+    def create_trip_report_pdf(self, record_data, save_path=None, min_images=0, image_index=None):
         """
         Create trip report PDF for a single complete record
         
         Args:
             record_data (dict): Record data dictionary
             save_path (str, optional): Custom save path. If None, auto-generated in today's folder
+            min_images (int, optional): Skip the report when fewer of the 4 images exist (default 0 - never skip)
+            image_index (dict, optional): Listing from get_image_index, for batches
             
         Returns:
             tuple: (success: bool, pdf_path: str or None)
@@ -163,75 +356,94 @@ class TripReportGenerator:
             print("Record is not complete - cannot generate trip report")
             return False, None
         
-        # Initialize temp files list
-        self._temp_files = []
+        # Resolve all 4 images before any decode work
+        image_paths = self._validate_images(record_data, image_index)
+        available_images = sum(1 for image_path in image_paths.values() if image_path)
+        if available_images < min_images:
+            logger.warning("Only %d of 4 images available for ticket %s - skipping trip report",
+                           available_images, record_data.get('ticket_no', 'Unknown'))
+            return False, None
+        
+        # One timestamp for the whole report (filename + print date)
+        now = datetime.datetime.now()
         
         try:
             # Generate save path if not provided
             if save_path is None:
-                filename = self.generate_trip_report_filename(record_data)
+                filename = self.generate_trip_report_filename(record_data, now)
                 save_path = os.path.join(self.todays_folder, filename)
             
             # Ensure directory exists
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(save_path, pagesize=A4,
-                                    rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
+            self.ensure_dir(os.path.dirname(save_path))
             
             # Build PDF content
-            elements = self.build_pdf_content(record_data)
+            elements = self.build_pdf_content(record_data, image_paths, now)
             
             # Generate PDF
-            doc.build(elements)
+            self.render_pdf(save_path, elements)
             
             print(f" Trip Report PDF generated successfully: {save_path}")
             return True, save_path
             
         except Exception as e:
-            print(f"❌ Error creating trip report PDF: {e}")
-            import traceback
-            print(f"Detailed error: {traceback.format_exc()}")
+            logger.exception("Error creating trip report PDF: %s", e)
             return False, None
-        finally:
-            # Clean up temporary files after PDF generation
-            self.cleanup_temp_files()
     
-    def build_pdf_content(self, record_data):
+    def render_pdf(self, save_path, elements):
+        """
+        Draw flowables straight onto a canvas, one A4 frame per page
+        
+        Trip reports fit on a single page, so this skips SimpleDocTemplate's page
+        template machinery. Anything that does not fit still moves to a new page.
+        
+        Args:
+            save_path (str): Output PDF path
+            elements (list): ReportLab flowables
+        """
+        page_width, page_height = A4
+        pdf_canvas = canvas.Canvas(save_path, pagesize=A4)
+        
+        pending = list(elements)
+        while pending:
+            # Same geometry as SimpleDocTemplate with 20pt margins (Frame keeps its default 6pt padding)
+            frame = Frame(20, 20, page_width - 40, page_height - 40)
+            remaining = len(pending)
+            frame.addFromList(pending, pdf_canvas)
+            if len(pending) == remaining:
+                raise LayoutError(f"Flowable too large for an empty page: {pending[0].__class__.__name__}")
+            pdf_canvas.showPage()
+        
+        pdf_canvas.save()
+    
+    def build_pdf_content(self, record_data, image_paths=None, now=None):
         """
         Build PDF content elements for the trip report
         
         Args:
             record_data (dict): Record data dictionary
+            image_paths (dict, optional): Resolved image paths from _validate_images
+            now (datetime, optional): Report timestamp used for the print date
             
         Returns:
             list: List of ReportLab elements
         """
-        elements = []
-        
         # Define styles
         styles = self.get_pdf_styles()
         
-        # Header section
-        elements.extend(self.create_header_section(record_data, styles))
-        
-        # Vehicle information section
-        elements.extend(self.create_vehicle_info_section(record_data, styles))
-        
-        # Weighment details section
-        elements.extend(self.create_weighment_section(record_data, styles))
-        
-        # Images section (4-image grid)
-        elements.extend(self.create_images_section(record_data, styles))
-        
-        # Signature section
-        elements.extend(self.create_signature_section(styles))
-        
-        return elements
+        # Each section yields its flowables; chain them into one list
+        return list(itertools.chain(
+            self.create_header_section(record_data, styles, now),          # Header section
+            self.create_vehicle_info_section(record_data, styles),         # Vehicle information section
+            self.create_weighment_section(record_data, styles),            # Weighment details section
+            self.create_images_section(record_data, styles, image_paths),  # Images section (4-image grid)
+            self.create_signature_section(styles),                         # Signature section
+        ))
     
-    def get_pdf_styles(self):
-        """Get PDF paragraph styles"""
-        base_styles = getSampleStyleSheet()
+    @classmethod
+    def get_pdf_styles(cls):
+        """Get PDF paragraph styles (built once and shared by every report)"""
+        if cls._styles_cache is not None:
+            return cls._styles_cache
         
         custom_styles = {
             'header': ParagraphStyle(
@@ -274,23 +486,22 @@ class TripReportGenerator:
             )
         }
         
+        cls._styles_cache = custom_styles
         return custom_styles
     
-    def create_header_section(self, record_data, styles):
+    def create_header_section(self, record_data, styles, now=None):
         """Create PDF header section with agency information"""
-        elements = []
-        
         # Get agency information
         agency_name = record_data.get('agency_name', 'Unknown Agency')
         agency_info = self.address_config.get('agencies', {}).get(agency_name, {})
         
         # Agency header
-        elements.append(Paragraph(agency_info.get('name', agency_name), styles['header']))
+        yield Paragraph(agency_info.get('name', agency_name), styles['header'])
         
         # Agency address
         if agency_info.get('address'):
             address_text = agency_info.get('address', '').replace('\n', '<br/>')
-            elements.append(Paragraph(address_text, styles['subheader']))
+            yield Paragraph(address_text, styles['subheader'])
         
         # Contact information
         contact_info = []
@@ -300,26 +511,22 @@ class TripReportGenerator:
             contact_info.append(f"Email: {agency_info.get('email')}")
         
         if contact_info:
-            elements.append(Paragraph(" | ".join(contact_info), styles['subheader']))
+            yield Paragraph(" | ".join(contact_info), styles['subheader'])
         
-        elements.append(Spacer(1, 0.2*inch))
+        yield Spacer(1, 0.2*inch)
         
         # Print date and ticket information
-        print_date = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        print_date = (now or datetime.datetime.now()).strftime("%d/%m/%Y %H:%M:%S")
         ticket_no = record_data.get('ticket_no', '000')
         
-        elements.append(Paragraph(f"Print Date: {print_date}", styles['value']))
-        elements.append(Paragraph(f"Ticket No: {ticket_no}", styles['header']))
-        elements.append(Spacer(1, 0.15*inch))
-        
-        return elements
+        yield Paragraph(f"Print Date: {print_date}", styles['value'])
+        yield Paragraph(f"Ticket No: {ticket_no}", styles['header'])
+        yield Spacer(1, 0.15*inch)
     
     def create_vehicle_info_section(self, record_data, styles):
         """Create vehicle information section"""
-        elements = []
-        
         # Section header
-        elements.append(Paragraph("VEHICLE INFORMATION", styles['section_header']))
+        yield Paragraph("VEHICLE INFORMATION", styles['section_header'])
         
         # Get values with fallbacks
         material_value = record_data.get('material', '') or record_data.get('material', '')
@@ -340,39 +547,19 @@ class TripReportGenerator:
         ]
         
         vehicle_inner_table = Table(vehicle_data, colWidths=[1.2*inch, 1.3*inch, 1.0*inch, 1.3*inch, 1.2*inch, 1.5*inch])
-        vehicle_inner_table.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,0), (-1,-1), 12),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 2),
-            ('RIGHTPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        vehicle_inner_table.setStyle(VEHICLE_INNER_STYLE)
         
         # Wrap in bordered table
         vehicle_table = Table([[vehicle_inner_table]], colWidths=[7.5*inch])
-        vehicle_table.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 1, colors.black),
-            ('LEFTPADDING', (0,0), (-1,-1), 12),
-            ('RIGHTPADDING', (0,0), (-1,-1), 12),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        
-        elements.append(vehicle_table)
-        elements.append(Spacer(1, 0.15*inch))
+        vehicle_table.setStyle(SECTION_BORDER_STYLE)
         
-        return elements
+        yield vehicle_table
+        yield Spacer(1, 0.15*inch)
     
     def create_weighment_section(self, record_data, styles):
         """Create weighment details section"""
-        elements = []
-        
         # Section header
-        elements.append(Paragraph("WEIGHMENT DETAILS", styles['section_header']))
+        yield Paragraph("WEIGHMENT DETAILS", styles['section_header'])
         
         # Get weight values
         first_weight_str = record_data.get('first_weight', '').strip()
@@ -392,7 +579,7 @@ class TripReportGenerator:
         # Format display weights
         first_weight_display = f"{first_weight_str} kg" if first_weight_str else "Not captured"
         second_weight_display = f"{second_weight_str} kg" if second_weight_str else "Not captured"
-        net_weight_display = f"{net_weight_str} kg" if net_weight_str and net_weight_str not in ["Not Available", "Unable to calculate", "Calculation Error"] else net_weight_str or "Not Available"
+        net_weight_display = f"{net_weight_str} kg" if net_weight_str and net_weight_str not in NET_WEIGHT_PLACEHOLDERS else net_weight_str or "Not Available"
         
         # Create weighment table
         weighment_data = [
@@ -404,50 +591,30 @@ class TripReportGenerator:
         ]
         
         weighment_inner_table = Table(weighment_data, colWidths=[1.5*inch, 1.5*inch, 1.2*inch, 2.8*inch])
-        weighment_inner_table.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,0), (-1,-1), 12),
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 2),
-            ('RIGHTPADDING', (0,0), (-1,-1), 2),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            ('SPAN', (2,2), (3,2)),
-            ('ALIGN', (2,2), (3,2), 'RIGHT'),
-        ]))
+        weighment_inner_table.setStyle(WEIGHMENT_INNER_STYLE)
         
         # Wrap in bordered table
         weighment_table = Table([[weighment_inner_table]], colWidths=[7.5*inch])
-        weighment_table.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 1, colors.black),
-            ('LEFTPADDING', (0,0), (-1,-1), 12),
-            ('RIGHTPADDING', (0,0), (-1,-1), 12),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        
-        elements.append(weighment_table)
-        elements.append(Spacer(1, 0.15*inch))
+        weighment_table.setStyle(SECTION_BORDER_STYLE)
         
-        return elements
+        yield weighment_table
+        yield Spacer(1, 0.15*inch)
     
-    def create_images_section(self, record_data, styles):
+    def create_images_section(self, record_data, styles, image_paths=None):
         """Create 4-image grid section"""
-        elements = []
-        
         # Section header
-        elements.append(Paragraph("VEHICLE IMAGES (4-Image System)", styles['section_header']))
+        yield Paragraph("VEHICLE IMAGES (4-Image System)", styles['section_header'])
         
         # Get ticket number for watermark
         ticket_no = record_data.get('ticket_no', '000')
         
-        # Get all 4 image paths
-        first_front_img_path = os.path.join(config.IMAGES_FOLDER, record_data.get('first_front_image', ''))
-        first_back_img_path = os.path.join(config.IMAGES_FOLDER, record_data.get('first_back_image', ''))
-        second_front_img_path = os.path.join(config.IMAGES_FOLDER, record_data.get('second_front_image', ''))
-        second_back_img_path = os.path.join(config.IMAGES_FOLDER, record_data.get('second_back_image', ''))
+        # Get all 4 image paths (None when missing)
+        if image_paths is None:
+            image_paths = self._validate_images(record_data)
+        first_front_img_path = image_paths['first_front_image']
+        first_back_img_path = image_paths['first_back_image']
+        second_front_img_path = image_paths['second_front_image']
+        second_back_img_path = image_paths['second_back_image']
         
         # Create 2x2 image grid with headers
         img_data = [
@@ -462,10 +629,34 @@ class TripReportGenerator:
         IMG_HEIGHT = 2.6*inch
         
         # Process images with high-quality method
-        first_front_img = self.process_image_for_pdf(first_front_img_path, f"Ticket: {ticket_no} - 1st Front", IMG_WIDTH, IMG_HEIGHT)
-        first_back_img = self.process_image_for_pdf(first_back_img_path, f"Ticket: {ticket_no} - 1st Back", IMG_WIDTH, IMG_HEIGHT)
-        second_front_img = self.process_image_for_pdf(second_front_img_path, f"Ticket: {ticket_no} - 2nd Front", IMG_WIDTH, IMG_HEIGHT)
-        second_back_img = self.process_image_for_pdf(second_back_img_path, f"Ticket: {ticket_no} - 2nd Back", IMG_WIDTH, IMG_HEIGHT)
+        jobs = [
+            (first_front_img_path, f"Ticket: {ticket_no} - 1st Front", IMG_WIDTH, IMG_HEIGHT),
+            (first_back_img_path, f"Ticket: {ticket_no} - 1st Back", IMG_WIDTH, IMG_HEIGHT),
+            (second_front_img_path, f"Ticket: {ticket_no} - 2nd Front", IMG_WIDTH, IMG_HEIGHT),
+            (second_back_img_path, f"Ticket: {ticket_no} - 2nd Back", IMG_WIDTH, IMG_HEIGHT),
+        ]
+        image_infos = [self.probe_image(job[0]) if job[0] else None for job in jobs]
+        
+        # Embedded-as-is JPEGs are a plain file read, so they run inline; only images that Pillow
+        # has to decode and resize (it releases the GIL meanwhile) are worth worker threads
+        results = [None] * len(jobs)
+        resize_jobs = []
+        for i, (job, image_info) in enumerate(zip(jobs, image_infos)):
+            if image_info is None or self.embeds_as_is(image_info):
+                results[i] = self.process_image_for_pdf(*job, image_info=image_info)
+            else:
+                resize_jobs.append(i)
+        
+        if len(resize_jobs) == 1:
+            i = resize_jobs[0]
+            results[i] = self.process_image_for_pdf(*jobs[i], image_info=image_infos[i])
+        elif resize_jobs:
+            with ThreadPoolExecutor(max_workers=len(resize_jobs)) as executor:
+                resized = executor.map(lambda i: self.process_image_for_pdf(*jobs[i], image_info=image_infos[i]),
+                                       resize_jobs)
+                for i, image in zip(resize_jobs, resized):
+                    results[i] = image
+        first_front_img, first_back_img, second_front_img, second_back_img = results
         
         # Fill the image grid
         img_data[1] = [first_front_img or "1st Front\nImage not available", 
@@ -477,51 +668,22 @@ class TripReportGenerator:
         img_table = Table(img_data, 
                          colWidths=[IMG_WIDTH, IMG_WIDTH],
                          rowHeights=[0.3*inch, IMG_HEIGHT, 0.3*inch, IMG_HEIGHT])
-        img_table.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (1,0), 12),
-            ('FONTSIZE', (0,2), (1,2), 12),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 6),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 6),
-            # Header background
-            ('BACKGROUND', (0,0), (1,0), colors.lightgrey),
-            ('BACKGROUND', (0,2), (1,2), colors.lightgrey),
-        ]))
-        
-        elements.append(img_table)
-        
-        return elements
+        img_table.setStyle(IMAGES_TABLE_STYLE)
+        
+        yield img_table
     
     def create_signature_section(self, styles):
         """Create signature section"""
-        elements = []
-        
         # Add spacing
-        elements.append(Spacer(1, 0.3*inch))
+        yield Spacer(1, 0.3*inch)
         
         # Signature line
         signature_table = Table([["", "Operator's Signature"]], colWidths=[5*inch, 2.5*inch])
-        signature_table.setStyle(TableStyle([
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-            ('FONTSIZE', (0,0), (-1,-1), 11),
-            ('ALIGN', (1,0), (1,0), 'RIGHT'),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('TOPPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-        ]))
-        
-        elements.append(signature_table)
-        
-        return elements
-    
-    def process_image_for_pdf(self, image_path, watermark_text, width, height):
+        signature_table.setStyle(SIGNATURE_TABLE_STYLE)
+        
+        yield signature_table
+    
+    def process_image_for_pdf(self, image_path, watermark_text, width, height, image_info=None):
         """
         Process image for PDF with high quality (no additional watermark since images already have them)
         
@@ -530,51 +692,70 @@ class TripReportGenerator:
             watermark_text (str): Text for watermark (not used since images already watermarked)
             width (float): Target width in ReportLab units
             height (float): Target height in ReportLab units
+            image_info (tuple, optional): probe_image result when the caller already has it
             
         Returns:
             RLImage or None: Processed ReportLab Image object
         """
-        if not image_path or not os.path.exists(image_path):
-            print(f"Image not found: {image_path}")
+        if not image_path:
+            logger.debug("Image not found: %s", image_path)
             return None
             
         try:
             # Prepare high-quality image (no additional watermark since images already have them)
-            temp_path = self.prepare_image_with_watermark(image_path, watermark_text, add_watermark=False)
-            if temp_path and os.path.exists(temp_path):
-                # Create ReportLab Image object
-                img = RLImage(temp_path, width=width, height=height)
-                
-                # Store temp path for later cleanup (don't delete immediately)
-                if not hasattr(self, '_temp_files'):
-                    self._temp_files = []
-                self._temp_files.append(temp_path)
-                
-                return img
+            image_buffer = self.prepare_image_with_watermark(image_path, watermark_text, add_watermark=False,
+                                                             image_info=image_info)
+            if image_buffer is not None:
+                # Create ReportLab Image object straight from the in-memory JPEG
+                return RLImage(image_buffer, width=width, height=height)
             else:
-                print(f"Failed to create temporary image for: {image_path}")
+                logger.warning("Failed to prepare image for: %s", image_path)
                 return None
         except Exception as e:
-            print(f"Error processing image for PDF: {e}")
-            import traceback
-            print(f"Detailed error: {traceback.format_exc()}")
+            logger.exception("Error processing image for PDF: %s", e)
             return None
         
         return None
     
     def cleanup_temp_files(self):
-        """Clean up temporary files after PDF generation"""
-        if hasattr(self, '_temp_files'):
-            for temp_file in self._temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                        print(f"Cleaned up temp file: {temp_file}")
-                except Exception as e:
-                    print(f"Warning: Could not clean up temp file {temp_file}: {e}")
-            self._temp_files = []
-    
-    def prepare_image_with_watermark(self, image_path, watermark_text, add_watermark=False):
+        """No-op: prepared images are kept in memory, so there are no temp files to remove"""
+        pass
+    
+    def probe_image(self, image_path):
+        """
+        Read image dimensions and format from the file header without decoding pixels
+        
+        Args:
+            image_path (str): Path to image file
+            
+        Returns:
+            tuple or None: (width, height, format) or None if the header can't be read
+        """
+        try:
+            with PILImage.open(image_path) as probe:
+                return probe.size[0], probe.size[1], probe.format
+        except Exception:
+            return None
+    
+    def embeds_as_is(self, image_info, add_watermark=False):
+        """
+        Whether a probed image goes into the PDF unchanged
+        
+        JPEGs up to 2x the target size are embedded as-is and scaled by ReportLab at render
+        time - no decode or re-encode; only dramatically oversized sources are shrunk.
+        
+        Args:
+            image_info (tuple or None): probe_image result
+            add_watermark (bool): Whether a watermark will be drawn on the image
+            
+        Returns:
+            bool: True if the file's bytes can be embedded directly
+        """
+        max_width, max_height = PDF_IMAGE_MAX_SIZE
+        return (not add_watermark and image_info is not None and image_info[2] == 'JPEG'
+                and image_info[0] <= 2 * max_width and image_info[1] <= 2 * max_height)
+    
+    def prepare_image_with_watermark(self, image_path, watermark_text, add_watermark=False, image_info=None):
         """
         Prepare image with high quality processing and optional watermark
         
@@ -582,100 +763,75 @@ class TripReportGenerator:
             image_path (str): Path to original image
             watermark_text (str): Text to add as watermark (if add_watermark=True)
             add_watermark (bool): Whether to add watermark (default False since images already have them)
+            image_info (tuple, optional): probe_image result when the caller already has it
             
         Returns:
-            str or None: Path to temporary processed image file
+            io.BytesIO or None: In-memory JPEG of the processed image
         """
         try:
-            # Verify the source image exists
-            if not os.path.exists(image_path):
-                print(f"❌ Source image not found: {image_path}")
-                return None
-            
-            print(f"📷 Processing image: {os.path.basename(image_path)}")
+            # A missing file shows up as a failed read below - no separate stat
+            logger.debug("Processing image: %s", image_path)
             
-            # Read image
-            img = cv2.imread(image_path)
-            if img is None:
-                print(f"❌ Could not read image: {image_path}")
-                return None
+            # Calculate new dimensions while maintaining aspect ratio
+            max_width, max_height = PDF_IMAGE_MAX_SIZE   # High quality
             
-            # Get original dimensions
-            original_height, original_width = img.shape[:2]
-            print(f"📐 Original image size: {original_width}x{original_height}")
+            if image_info is None:
+                image_info = self.probe_image(image_path)
             
-            # Calculate new dimensions while maintaining aspect ratio
-            max_width = 1200   # High quality
-            max_height = 900   # High quality
+            # Fast path: no decode or re-encode
+            if self.embeds_as_is(image_info, add_watermark):
+                with open(image_path, 'rb') as f:
+                    return io.BytesIO(f.read())
             
-            # Calculate scaling factor
-            scale_w = max_width / original_width
-            scale_h = max_height / original_height
-            scale = min(scale_w, scale_h)
+            if image_info is None:
+                logger.warning("Could not read image: %s", image_path)
+                return None
             
-            new_width = int(original_width * scale)
-            new_height = int(original_height * scale)
+            logger.debug("Original image size: %dx%d", image_info[0], image_info[1])
             
-            print(f"📐 Resized image size: {new_width}x{new_height} (scale: {scale:.3f})")
+            with PILImage.open(image_path) as source:
+                # Let libjpeg decode at the smallest 1/2, 1/4 or 1/8 scale that still covers the target
+                source.draft('RGB', (max_width, max_height))
+                img = source.convert('RGB')
             
-            # Use high-quality interpolation
-            img_resized = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
+            # Shrink to fit while keeping the aspect ratio (never upsamples - ReportLab scales into the cell)
+            img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
+            logger.debug("Resized image size: %dx%d", img.width, img.height)
             
             # Only add watermark if explicitly requested (images already have watermarks)
             if add_watermark:
                 try:
                     from camera import add_watermark
-                    watermarked_img = add_watermark(img_resized, watermark_text)
-                    print(f"💧 Added additional watermark: {watermark_text}")
+                    # camera.add_watermark draws on OpenCV-style BGR arrays
+                    bgr_img = np.ascontiguousarray(np.asarray(img)[:, :, ::-1])
+                    bgr_img = add_watermark(bgr_img, watermark_text)
+                    img = PILImage.fromarray(np.ascontiguousarray(bgr_img[:, :, ::-1]))
+                    logger.debug("Added additional watermark: %s", watermark_text)
                 except ImportError:
-                    print("⚠️  Watermark function not available, using image as-is")
-                    watermarked_img = img_resized
+                    logger.warning("Watermark function not available, using image as-is")
                 except Exception as watermark_error:
-                    print(f"⚠️  Watermark error: {watermark_error}, using image as-is")
-                    watermarked_img = img_resized
-            else:
-                # Use image as-is (already has watermark from camera capture)
-                watermarked_img = img_resized
-                print(f"📷 Using existing watermark from camera capture")
+                    logger.warning("Watermark error: %s, using image as-is", watermark_error)
             
-            # Create unique temporary filename
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-            original_name = os.path.splitext(os.path.basename(image_path))[0]
-            temp_filename = f"trip_temp_{original_name}_{timestamp}.jpg"
-            temp_path = os.path.join(config.IMAGES_FOLDER, temp_filename)
+            # Encode straight into memory - 85% is indistinguishable from 95% at 3.5x2.6 inches, at about half the bytes
+            image_buffer = io.BytesIO()
+            img.save(image_buffer, 'JPEG', quality=85, optimize=False)
+            image_buffer.seek(0)
             
-            # Ensure images folder exists
-            os.makedirs(config.IMAGES_FOLDER, exist_ok=True)
-            
-            # Save with high quality (95% JPEG quality)
-            success = cv2.imwrite(temp_path, watermarked_img, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
-            
-            if success:
-                print(f"💾 Prepared high-quality image: {temp_path}")
-                # Verify the file was actually created
-                if os.path.exists(temp_path):
-                    file_size = os.path.getsize(temp_path)
-                    print(f" Temp file verified: {file_size} bytes")
-                    return temp_path
-                else:
-                    print(f"❌ Temp file not found after creation: {temp_path}")
-                    return None
-            else:
-                print(f"❌ Failed to save temporary image: {temp_path}")
-                return None
+            logger.debug("Prepared high-quality image in memory: %d bytes", image_buffer.getbuffer().nbytes)
+            return image_buffer
             
         except Exception as e:
-            print(f"❌ Error preparing image with watermark: {e}")
-            import traceback
-            print(f"Detailed error: {traceback.format_exc()}")
+            logger.exception("Error preparing image with watermark: %s", e)
             return None
     
-    def auto_generate_trip_report(self, record_data):
+    def auto_generate_trip_report(self, record_data, notify=True, image_index=None):
         """
         Automatically generate trip report for a complete record
         
         Args:
             record_data (dict): Record data dictionary
+            notify (bool): Show a message box once the report is generated
+            image_index (dict, optional): Listing from get_image_index, for batches
             
         Returns:
             tuple: (success: bool, pdf_path: str or None)
@@ -689,20 +845,28 @@ class TripReportGenerator:
                 return False, None
             
             # Generate the PDF
-            success, pdf_path = self.create_trip_report_pdf(record_data)
+            success, pdf_path = self.create_trip_report_pdf(record_data, image_index=image_index)
             
             if success:
                 print(f" Auto-generated trip report: {pdf_path}")
                 
-                # Optional: Show success message
-                try:
-                    from tkinter import messagebox
-                    messagebox.showinfo("Trip Report Generated", 
-                                      f"Trip report generated successfully!\n\n"
-                                      f"File: {os.path.basename(pdf_path)}\n"
-                                      f"Location: {self.todays_folder}")
-                except:
-                    pass  # GUI not available
+                # Optional: Show success message without blocking the completion pipeline
+                if notify:
+                    try:
+                        import tkinter
+                        from tkinter import messagebox
+                        message = (f"Trip report generated successfully!\n\n"
+                                   f"File: {os.path.basename(pdf_path)}\n"
+                                   f"Location: {self.todays_folder}")
+                        root = getattr(tkinter, '_default_root', None)
+                        if root is not None:
+                            # Let the app's event loop show it once this call has returned
+                            root.after(0, lambda: messagebox.showinfo("Trip Report Generated", message))
+                        else:
+                            # No app window - Tk can't safely build a dialog from here
+                            logger.info("Trip report generated: %s", pdf_path)
+                    except Exception:
+                        pass  # GUI not available
                 
                 return True, pdf_path
             else:
@@ -713,8 +877,121 @@ class TripReportGenerator:
             print(f"❌ Error in auto-generation: {e}")
             return False, None
 
+    
+    def auto_generate_batch(self, records, max_workers=4, min_images=0):
+        """
+        Generate trip reports for many records, sharing this instance's address
+        config, styles and folder caches across the whole batch
+        
+        Args:
+            records (list): Record data dictionaries
+            max_workers (int): Number of reports generated concurrently
+            min_images (int): Passed to create_trip_report_pdf for each record
+            
+        Returns:
+            list: (success: bool, pdf_path: str or None) per record, in input order
+        """
+        if not records:
+            return []
+        
+        logger.info("Batch generating %d trip reports with %d workers", len(records), max_workers)
+        
+        # One listing of the images folder resolves the images of every record in the batch
+        image_index = self.get_image_index()
+        
+        # Each report still fans its 4 images out to its own pool; sharing one bounded
+        # pool between reports and their images could deadlock
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda record: self.create_trip_report_pdf(record, min_images=min_images,
+                                                           image_index=image_index), records))
+        
+        generated = sum(1 for success, _ in results if success)
+        logger.info("Batch trip report generation finished: %d/%d generated", generated, len(records))
+        return results
+
+
+# Process pool for batch PDF rendering - created on first use, one generator per worker
+_PDF_POOL = None
+_PDF_POOL_LOCK = threading.Lock()
+_worker_generator = None
+
+
+def _init_pdf_worker():
+    """Pool initializer: build the worker's TripReportGenerator once instead of per record"""
+    global _worker_generator
+    _worker_generator = TripReportGenerator()
+
+
+def _generate_in_worker(record_data):
+    """Render one record inside a pool worker; dialogs stay with the GUI process"""
+    # Workers outlive the day and address edits - pick both up like _get_generator does
+    _worker_generator.refresh()
+    # Pool workers only serve batches, so the cached folder listing is reused across records
+    return _worker_generator.auto_generate_trip_report(record_data, notify=False,
+                                                       image_index=_worker_generator.get_image_index())
+
+
+def _get_pdf_pool():
+    """Return the shared PDF process pool, starting it on first use"""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            workers = max(1, (os.cpu_count() or 2) // 2)
+            _PDF_POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker)
+            logger.info("Started trip report process pool with %d workers", workers)
+        return _PDF_POOL
+
+
+# Generator shared by the convenience functions below
+_shared_generator = None
+_shared_generator_lock = threading.Lock()
+
+
+def _get_generator(refresh=True):
+    """
+    Return the TripReportGenerator shared by the module-level convenience functions
+    
+    Callers that need an independent configuration should instantiate
+    TripReportGenerator directly.
+    
+    Args:
+        refresh (bool): Re-check the address config and today's folder before returning
+    """
+    global _shared_generator
+    with _shared_generator_lock:
+        if _shared_generator is None:
+            _shared_generator = TripReportGenerator()
+        elif refresh:
+            _shared_generator.refresh()
+        return _shared_generator
+
 
 # Convenience functions for external usage
+def submit_batch(records):
+    """
+    Submit trip reports for several completed records to parallel worker processes
+    
+    Unlike TripReportGenerator.auto_generate_batch, this returns at once with futures
+    rather than results; call .result() on each to wait for its report.
+    
+    Incomplete records resolve to (False, None) like auto_generate_on_completion. On
+    platforms that spawn workers (Windows) the calling script must be guarded by
+    if __name__ == "__main__", since each worker re-imports it.
+    
+    Args:
+        records (list): Record data dictionaries
+        
+    Returns:
+        list: concurrent.futures.Future per record, each resolving to (success: bool, pdf_path: str or None)
+    """
+    if not records:
+        return []
+    
+    pool = _get_pdf_pool()
+    return [pool.submit(_generate_in_worker, record_data) for record_data in records]
+
+
 def generate_trip_report(record_data, save_path=None):
     """
     Generate trip report PDF for a single record
@@ -726,8 +1003,7 @@ def generate_trip_report(record_data, save_path=None):
     Returns:
         tuple: (success: bool, pdf_path: str or None)
     """
-    generator = TripReportGenerator()
-    return generator.create_trip_report_pdf(record_data, save_path)
+    return _get_generator().create_trip_report_pdf(record_data, save_path)
 
 
 def auto_generate_on_completion(record_data):
@@ -740,8 +1016,7 @@ def auto_generate_on_completion(record_data):
     Returns:
         tuple: (success: bool, pdf_path: str or None)
     """
-    generator = TripReportGenerator()
-    return generator.auto_generate_trip_report(record_data)
+    return _get_generator().auto_generate_trip_report(record_data)
 
 
 def is_record_complete(record_data):
@@ -754,8 +1029,8 @@ def is_record_complete(record_data):
     Returns:
         bool: True if record is complete, False otherwise
     """
-    generator = TripReportGenerator()
-    return generator.is_record_complete(record_data)
+    # Completeness only looks at the record itself
+    return _get_generator(refresh=False).is_record_complete(record_data)
 
 
 # Example usage
@@ -9,25 +9,118 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Tuple
 import argparse
+import functools
+import os
 import sys
+import warnings
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import numba  # noqa: F401 - enables engine='numba' for groupby reductions
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+NUMBA_ENGINE_KWARGS = {'parallel': True, 'nogil': True, 'nopython': True}
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+# Only these columns are read; the rest of the export is never used
+REQUIRED_COLUMNS = ['date', 'material', 'net_weight']
+CSV_DTYPES = {'material': 'string', 'net_weight': 'float64'}
+
+
+@functools.lru_cache(maxsize=8)
+def _read_csv_cached(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """
+    Parse a waste CSV once per (path, mtime, size); a rewritten file gets a fresh key
+    
+    Callers must copy the result before mutating it
+    """
+    # Exports may pad their headers ("date , material") - select and type columns by stripped name
+    raw_names = {col.strip(): col for col in pd.read_csv(path, nrows=0).columns}
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in raw_names]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+    read_kwargs = {
+        'usecols': [raw_names[col] for col in REQUIRED_COLUMNS],
+        'parse_dates': [raw_names['date']],
+        'dtype': {raw_names[col]: dtype for col, dtype in CSV_DTYPES.items()},
+    }
+    if PYARROW_AVAILABLE:
+        read_kwargs['engine'] = 'pyarrow'
+    df = pd.read_csv(path, **read_kwargs)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """Write a summary frame with PyArrow's C++ CSV writer, falling back to pandas"""
+    if not PYARROW_AVAILABLE:
+        df.to_csv(path, index=False, date_format='%Y-%m-%d')
+        return
+    
+    # Plain date strings and material names as text so the file reads back like the pandas one
+    df = df.assign(**{
+        col: df[col].dt.strftime('%Y-%m-%d') if col == 'date' else df[col].astype(str)
+        for col in df.columns if col in ('date', 'material')
+    })
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pacsv.write_csv(table, path)
+
+
+@functools.lru_cache(maxsize=1)
+def _warm_numba_groupby() -> None:
+    """Compile the numba grouped-sum kernel once so the first real summary doesn't pay for the JIT"""
+    dummy = pd.DataFrame({'key': ['a', 'b', 'a'], 'value': [1.0, 2.0, 3.0]})
+    with warnings.catch_warnings():
+        # pandas' kernel casts its NA bookkeeping from uint64; harmless for weights
+        warnings.simplefilter('ignore', numba.NumbaTypeSafetyWarning)
+        dummy.groupby('key')['value'].sum(engine='numba', engine_kwargs=NUMBA_ENGINE_KWARGS)
 
 class WasteAnalyzer:
     """
     A class to analyze waste management data with daily and cumulative reporting
     """
     
-    def __init__(self, csv_file: str):
+    def __init__(self, csv_file: str, use_numba: bool = False, backend: str = 'pandas'):
         """
         Initialize the analyzer with CSV data
         
         Args:
             csv_file (str): Path to the CSV file
+            use_numba (bool): Aggregate weights with pandas' numba engine (requires numba)
+            backend (str): 'pandas', or 'polars' to scan, filter and group the CSV lazily (requires polars)
         """
         self.csv_file = csv_file
+        if use_numba and not NUMBA_AVAILABLE:
+            print("⚠️ numba not installed - using the default groupby engine")
+            use_numba = False
+        self.use_numba = use_numba
+        if backend not in ('pandas', 'polars'):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == 'polars' and not POLARS_AVAILABLE:
+            print("⚠️ polars not installed - using the pandas backend")
+            backend = 'pandas'
+        self.backend = backend
         self.data = None
         self.filtered_data = None
         self.daily_summary = {}
         self.cumulative_summary = {}
+        self._base_groups = None
+        self._daily_df = None
+        self._cumulative_df = None
+        self._sorted_dates = []
         
     def load_data(self) -> bool:
         """
@@ -36,24 +129,54 @@ class WasteAnalyzer:
         Returns:
             bool: True if successful, False otherwise
         """
+        if self.backend == 'polars':
+            return self._load_data_polars()
+        
         try:
-            self.data = pd.read_csv(self.csv_file)
-            
-            # Clean column names (remove extra spaces and empty columns)
-            self.data.columns = self.data.columns.str.strip()
-            self.data = self.data.loc[:, ~self.data.columns.str.contains('^Unnamed')]
+            st = os.stat(self.csv_file)
+            try:
+                self.data = _read_csv_cached(self.csv_file, st.st_mtime_ns, st.st_size).copy()
+            except ValueError:
+                # Raised when a required column is absent - report which ones
+                header = pd.read_csv(self.csv_file, nrows=0).columns.str.strip()
+                missing_cols = [col for col in REQUIRED_COLUMNS if col not in header]
+                if missing_cols:
+                    print(f"❌ Missing required columns: {missing_cols}")
+                    return False
+                raise
             
             print(f"✅ Loaded {len(self.data)} records from {self.csv_file}")
             print(f"📊 Columns: {list(self.data.columns)}")
+                
+            return True
             
-            # Validate required columns
-            required_cols = ['date', 'material', 'net_weight']
-            missing_cols = [col for col in required_cols if col not in self.data.columns]
-            
+        except Exception as e:
+            print(f"❌ Error loading data: {e}")
+            return False
+    
+    def _load_data_polars(self) -> bool:
+        """
+        Set up a lazy polars scan of the CSV; only the header is read here
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Match padded headers ("date , material") by their stripped names, like the pandas load
+            raw_names = {col.strip(): col for col in pl.read_csv(self.csv_file, n_rows=0).columns}
+            missing_cols = [col for col in REQUIRED_COLUMNS if col not in raw_names]
             if missing_cols:
                 print(f"❌ Missing required columns: {missing_cols}")
                 return False
-                
+            
+            scan = pl.scan_csv(self.csv_file, schema_overrides={
+                raw_names['date']: pl.Date, raw_names['material']: pl.String, raw_names['net_weight']: pl.Float64})
+            self.data = scan.select([pl.col(raw_names[col]).alias(col) for col in REQUIRED_COLUMNS])
+            
+            # Counting rows would scan the whole file once more - the filter query reports them instead
+            print(f"✅ Opened {self.csv_file} for a lazy scan")
+            print(f"📊 Columns: {REQUIRED_COLUMNS}")
+            
             return True
             
         except Exception as e:
@@ -70,17 +193,24 @@ class WasteAnalyzer:
         Returns:
             bool: True if successful, False otherwise
         """
+        if self.backend == 'polars':
+            return self._filter_data_polars(cutoff_date)
+        
         try:
-            # Convert date column to datetime
-            self.data['date'] = pd.to_datetime(self.data['date'])
+            # Date column is already parsed by read_csv
             cutoff = pd.to_datetime(cutoff_date)
             
-            # Filter data
-            self.filtered_data = self.data[
+            # Filter data - boolean .loc already returns new columns, so no extra .copy() is needed
+            mask = (
                 (self.data['date'] <= cutoff) & 
                 (self.data['net_weight'].notna()) & 
                 (self.data['net_weight'] > 0)
-            ].copy()
+            )
+            self.filtered_data = self.data.loc[mask, REQUIRED_COLUMNS].reset_index(drop=True)
+            self._base_groups = None
+            
+            # Few distinct materials - group on integer category codes instead of hashing strings
+            self.filtered_data['material'] = self.filtered_data['material'].astype('category')
             
             date_range = f"{self.filtered_data['date'].min().strftime('%Y-%m-%d')} to {self.filtered_data['date'].max().strftime('%Y-%m-%d')}"
             
@@ -94,68 +224,122 @@ class WasteAnalyzer:
             print(f"❌ Error filtering data: {e}")
             return False
     
+    def _filter_data_polars(self, cutoff_date: str) -> bool:
+        """
+        Filter and group the lazy scan in one polars query; the predicates are pushed into the CSV read
+        
+        Only the (date, material) groups are materialized, as pandas, for the summaries
+        
+        Args:
+            cutoff_date (str): Date in 'YYYY-MM-DD' format
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            cutoff = datetime.strptime(cutoff_date, '%Y-%m-%d').date()
+            
+            groups = (
+                self.data
+                .filter((pl.col('date') <= cutoff) & (pl.col('net_weight') > 0))
+                .group_by(['date', 'material'])
+                .agg(pl.col('net_weight').sum().alias('total_weight_kg'), pl.len().alias('records'))
+                .sort(['date', 'material'])
+                .collect()
+            )
+            
+            # Row-level data never leaves polars; the summaries start from the groups
+            self.filtered_data = None
+            self._base_groups = pd.DataFrame({
+                'date': pd.to_datetime(groups['date'].to_numpy()),
+                'material': pd.Categorical(groups['material'].to_list()),
+                'total_weight_kg': groups['total_weight_kg'].to_numpy(),
+                'records': groups['records'].to_numpy().astype('int64')
+            })
+            
+            date_range = f"{groups['date'].min().strftime('%Y-%m-%d')} to {groups['date'].max().strftime('%Y-%m-%d')}"
+            
+            print(f"📅 Filtered data: {int(groups['records'].sum())} records")
+            print(f"📅 Date range: {date_range}")
+            print(f"🏭 Material types: {list(self._base_groups['material'].cat.categories)}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error filtering data: {e}")
+            return False
+    
     def kg_to_mt(self, kg_value: float) -> float:
-        """Convert kilograms to metric tons"""
+        """Convert kilograms to metric tons (scalars; Series columns divide by 1000 directly)"""
         return kg_value / 1000
     
+    def _compute_base_groups(self) -> pd.DataFrame:
+        """
+        Group filtered data by (date, material) once; daily and cumulative summaries both derive from it
+        
+        Returns:
+            pd.DataFrame: Columns date, material, total_weight_kg, records
+        """
+        if self._base_groups is None:
+            grouped = self.filtered_data.groupby(['date', 'material'], observed=True)['net_weight']
+            if self.use_numba:
+                _warm_numba_groupby()
+                base_groups = pd.DataFrame({
+                    'sum': grouped.sum(engine='numba', engine_kwargs=NUMBA_ENGINE_KWARGS),
+                    'count': grouped.count()
+                }).reset_index()
+            else:
+                base_groups = grouped.agg(['sum', 'count']).reset_index()
+            base_groups.columns = ['date', 'material', 'total_weight_kg', 'records']
+            self._base_groups = base_groups
+        return self._base_groups
+    
     def calculate_daily_summary(self) -> None:
-        """Calculate daily material summaries"""
+        """Calculate daily material summaries, keyed by datetime.date"""
         
         # Group by date and material
-        daily_groups = self.filtered_data.groupby(['date', 'material'])['net_weight'].agg(['sum', 'count']).reset_index()
-        daily_groups.columns = ['date', 'material', 'total_weight_kg', 'records']
+        daily_groups = self._compute_base_groups()
         
-        # Calculate daily totals
-        daily_totals = daily_groups.groupby('date')['total_weight_kg'].sum().reset_index()
-        daily_totals.columns = ['date', 'day_total_kg']
-        
-        # Merge to get percentages
-        daily_with_totals = daily_groups.merge(daily_totals, on='date')
+        # Broadcast daily totals back onto each (date, material) row - no second frame or join
+        daily_with_totals = daily_groups.copy()
+        by_date = daily_with_totals.groupby('date')
+        daily_with_totals['day_total_kg'] = by_date['total_weight_kg'].transform('sum')
         daily_with_totals['percentage'] = (daily_with_totals['total_weight_kg'] / daily_with_totals['day_total_kg']) * 100
-        daily_with_totals['total_weight_mt'] = daily_with_totals['total_weight_kg'].apply(self.kg_to_mt)
-        
-        # Create daily summary structure
-        for _, row in daily_with_totals.iterrows():
-            date_str = row['date'].strftime('%Y-%m-%d')
-            
-            if date_str not in self.daily_summary:
-                self.daily_summary[date_str] = {
-                    'materials': {},
-                    'total_weight_kg': row['day_total_kg'],
-                    'total_weight_mt': self.kg_to_mt(row['day_total_kg']),
-                    'total_records': 0
-                }
-            
-            self.daily_summary[date_str]['materials'][row['material']] = {
-                'total_weight_kg': row['total_weight_kg'],
-                'total_weight_mt': row['total_weight_mt'],
-                'percentage': row['percentage'],
-                'records': row['records']
+        daily_with_totals['total_weight_mt'] = daily_with_totals['total_weight_kg'] / 1000
+        daily_with_totals['day_records'] = by_date['records'].transform('sum')
+        
+        # Create daily summary structure - one vectorized dict build per day instead of per row;
+        # materials are inserted heaviest first so reports can print them without re-sorting
+        material_cols = ['total_weight_kg', 'total_weight_mt', 'percentage', 'records']
+        by_weight = daily_with_totals.sort_values(['date', 'total_weight_mt'], ascending=[True, False], kind='stable')
+        for date, day_rows in by_weight.groupby('date', sort=True):
+            day_total_kg = day_rows['day_total_kg'].iat[0]
+            self.daily_summary[date.date()] = {
+                'materials': day_rows.set_index('material')[material_cols].to_dict(orient='index'),
+                'total_weight_kg': day_total_kg,
+                'total_weight_mt': self.kg_to_mt(day_total_kg),
+                'total_records': day_rows['day_records'].iat[0]
             }
         
-        # Calculate total records per day
-        daily_record_counts = self.filtered_data.groupby('date').size()
-        for date_str in self.daily_summary:
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            if date_obj in daily_record_counts.index:
-                self.daily_summary[date_str]['total_records'] = daily_record_counts[date_obj]
+        self._daily_df = daily_with_totals
+        self._sorted_dates = sorted(self.daily_summary)
     
     def calculate_cumulative_summary(self) -> None:
         """Calculate cumulative material summaries"""
         
-        # Group by material for cumulative analysis
-        cumulative_groups = self.filtered_data.groupby('material')['net_weight'].agg(['sum', 'count']).reset_index()
-        cumulative_groups.columns = ['material', 'total_weight_kg', 'records']
+        # Group by material for cumulative analysis - re-reduces the (date, material) table, not the raw rows
+        cumulative_groups = self._compute_base_groups().groupby('material', observed=True)[['total_weight_kg', 'records']].sum().reset_index()
         
         # Calculate total weight for percentages
         grand_total_kg = cumulative_groups['total_weight_kg'].sum()
         
         # Calculate percentages and convert to MT
         cumulative_groups['percentage'] = (cumulative_groups['total_weight_kg'] / grand_total_kg) * 100
-        cumulative_groups['total_weight_mt'] = cumulative_groups['total_weight_kg'].apply(self.kg_to_mt)
+        cumulative_groups['total_weight_mt'] = cumulative_groups['total_weight_kg'] / 1000
         
-        # Create cumulative summary structure
-        for _, row in cumulative_groups.iterrows():
+        # Create cumulative summary structure, heaviest material first so reports need no re-sort
+        by_weight = cumulative_groups.sort_values('total_weight_kg', ascending=False, kind='stable')
+        for _, row in by_weight.iterrows():
             self.cumulative_summary[row['material']] = {
                 'total_weight_kg': row['total_weight_kg'],
                 'total_weight_mt': row['total_weight_mt'],
@@ -166,31 +350,36 @@ class WasteAnalyzer:
         self.cumulative_summary['_totals'] = {
             'total_weight_kg': grand_total_kg,
             'total_weight_mt': self.kg_to_mt(grand_total_kg),
-            'total_records': len(self.filtered_data),
+            'total_records': int(cumulative_groups['records'].sum()),
             'total_days': len(self.daily_summary)
         }
+        
+        self._cumulative_df = cumulative_groups
     
     def print_cumulative_report(self) -> None:
         """Print cumulative summary report"""
         totals = self.cumulative_summary['_totals']
         
-        print("\n" + "="*60)
-        print("CUMULATIVE SUMMARY REPORT")
-        print("="*60)
-        print(f"Total Weight Processed: {totals['total_weight_mt']:.2f} MT")
-        print(f"Total Records: {totals['total_records']:,}")
-        print(f"Total Days: {totals['total_days']}")
-        print(f"Average Daily Processing: {totals['total_weight_mt']/totals['total_days']:.2f} MT/day")
-        
-        print(f"\n{'Material Type':<15} {'Weight (MT)':<12} {'Percentage':<12} {'Records':<10}")
-        print("-" * 50)
-        
-        # Sort materials by weight (descending)
-        materials = [(k, v) for k, v in self.cumulative_summary.items() if k != '_totals']
-        materials.sort(key=lambda x: x[1]['total_weight_mt'], reverse=True)
-        
-        for material, data in materials:
-            print(f"{material:<15} {data['total_weight_mt']:>10.2f} {data['percentage']:>10.1f}% {data['records']:>8}")
+        lines = [
+            "\n" + "="*60,
+            "CUMULATIVE SUMMARY REPORT",
+            "="*60,
+            f"Total Weight Processed: {totals['total_weight_mt']:.2f} MT",
+            f"Total Records: {totals['total_records']:,}",
+            f"Total Days: {totals['total_days']}",
+            f"Average Daily Processing: {totals['total_weight_mt']/totals['total_days']:.2f} MT/day",
+            f"\n{'Material Type':<15} {'Weight (MT)':<12} {'Percentage':<12} {'Records':<10}",
+            "-" * 50
+        ]
+        
+        # Materials are already stored heaviest first
+        for material, data in self.cumulative_summary.items():
+            if material == '_totals':
+                continue
+            lines.append(f"{material:<15} {data['total_weight_mt']:>10.2f} {data['percentage']:>10.1f}% {data['records']:>8}")
+        
+        # One write for the whole report instead of a print() per line
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def print_daily_report(self, show_all_days: bool = False) -> None:
         """
@@ -199,11 +388,13 @@ class WasteAnalyzer:
         Args:
             show_all_days (bool): If True, show all days. If False, show sample days.
         """
-        print("\n" + "="*80)
-        print("DAILY SUMMARY REPORT")
-        print("="*80)
+        lines = [
+            "\n" + "="*80,
+            "DAILY SUMMARY REPORT",
+            "="*80
+        ]
         
-        sorted_dates = sorted(self.daily_summary.keys())
+        sorted_dates = self._sorted_dates
         
         if show_all_days:
             dates_to_show = sorted_dates
@@ -221,20 +412,20 @@ class WasteAnalyzer:
                     sorted_dates[-1]   # Last day
                 ]
         
+        append = lines.append
         for date in dates_to_show:
             day_data = self.daily_summary[date]
-            print(f"\n📅 {date} - Total: {day_data['total_weight_mt']:.2f} MT ({day_data['total_records']} records)")
+            append(f"\n📅 {date.isoformat()} - Total: {day_data['total_weight_mt']:.2f} MT ({day_data['total_records']} records)")
             
-            # Sort materials by weight for this day
-            materials = sorted(day_data['materials'].items(), 
-                             key=lambda x: x[1]['total_weight_mt'], reverse=True)
-            
-            for material, mat_data in materials:
-                print(f"   {material:<12} | {mat_data['total_weight_mt']:>8.2f} MT | {mat_data['percentage']:>5.1f}% | {mat_data['records']:>3} records")
+            # Materials are already stored heaviest first
+            for material, mat_data in day_data['materials'].items():
+                append(f"   {material:<12} | {mat_data['total_weight_mt']:>8.2f} MT | {mat_data['percentage']:>5.1f}% | {mat_data['records']:>3} records")
         
         if not show_all_days and len(sorted_dates) > 6:
-            print(f"\n... ({len(sorted_dates) - 6} more days) ...")
-            print("Use --show-all-days flag to see complete daily breakdown")
+            append(f"\n... ({len(sorted_dates) - 6} more days) ...")
+            append("Use --show-all-days flag to see complete daily breakdown")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def export_to_csv(self, output_prefix: str = "waste_analysis") -> None:
         """
@@ -243,39 +434,24 @@ class WasteAnalyzer:
         Args:
             output_prefix (str): Prefix for output files
         """
+        if self._daily_df is None or self._cumulative_df is None:
+            print("❌ Nothing to export - run the daily and cumulative summaries first")
+            return
+        
         try:
-            # Export daily summary
-            daily_rows = []
-            for date, day_data in self.daily_summary.items():
-                for material, mat_data in day_data['materials'].items():
-                    daily_rows.append({
-                        'date': date,
-                        'material': material,
-                        'weight_mt': mat_data['total_weight_mt'],
-                        'percentage': mat_data['percentage'],
-                        'records': mat_data['records'],
-                        'day_total_mt': day_data['total_weight_mt']
-                    })
-            
-            daily_df = pd.DataFrame(daily_rows)
+            # Export daily summary straight from the grouped frame
+            daily_df = self._daily_df[['date', 'material', 'total_weight_mt', 'percentage', 'records']].rename(
+                columns={'total_weight_mt': 'weight_mt'})
+            daily_df['day_total_mt'] = self._daily_df['day_total_kg'] / 1000
             daily_file = f"{output_prefix}_daily.csv"
-            daily_df.to_csv(daily_file, index=False)
+            _write_csv(daily_df, daily_file)
             print(f"📄 Daily summary exported to: {daily_file}")
             
             # Export cumulative summary
-            cumulative_rows = []
-            for material, data in self.cumulative_summary.items():
-                if material != '_totals':
-                    cumulative_rows.append({
-                        'material': material,
-                        'weight_mt': data['total_weight_mt'],
-                        'percentage': data['percentage'],
-                        'records': data['records']
-                    })
-            
-            cumulative_df = pd.DataFrame(cumulative_rows)
+            cumulative_df = self._cumulative_df[['material', 'total_weight_mt', 'percentage', 'records']].rename(
+                columns={'total_weight_mt': 'weight_mt'})
             cumulative_file = f"{output_prefix}_cumulative.csv"
-            cumulative_df.to_csv(cumulative_file, index=False)
+            _write_csv(cumulative_df, cumulative_file)
             print(f"📄 Cumulative summary exported to: {cumulative_file}")
             
         except Exception as e:
@@ -327,6 +503,9 @@ def main():
     parser.add_argument('--cutoff-date', required=True, help='Cutoff date (YYYY-MM-DD)')
     parser.add_argument('--show-all-days', action='store_true', help='Show all days in daily report')
     parser.add_argument('--export', action='store_true', help='Export results to CSV files')
+    parser.add_argument('--use-numba', action='store_true', help='Aggregate with the numba engine (requires numba)')
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                        help='DataFrame library for loading and grouping (polars must be installed)')
     
     args = parser.parse_args()
     
@@ -338,7 +517,7 @@ def main():
         sys.exit(1)
     
     # Run analysis
-    analyzer = WasteAnalyzer(args.csv_file)
+    analyzer = WasteAnalyzer(args.csv_file, use_numba=args.use_numba, backend=args.backend)
     success = analyzer.run_analysis(
         cutoff_date=args.cutoff_date,
         show_all_days=args.show_all_days,
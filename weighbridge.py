@@ -2,13 +2,22 @@ import serial
 import serial.tools.list_ports
 import threading
 import time
+import math
+import random
 import re
 import datetime
 import os
+import errno
+import select
 import signal
 import sys
 from contextlib import contextmanager
 
+try:
+    import re._parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
 # Import the unified logging system - maintain compatibility
 try:
     from unified_logging import setup_enhanced_logger
@@ -18,6 +27,61 @@ except ImportError:
 
 import config
 
+# Weight parsing patterns - compiled once instead of looked up in re's cache per serial line.
+# They run on the raw bytes from the port; frames are ASCII so no decode is needed
+# "NumberWt:" format (e.g., "1600Wt:    1500Wt:    1500Wt:") - only the leading weight is used,
+# so match the 2-5 digit prefix and check the "Wt:" suffix with plain bytes operations
+_WT_PREFIX_RE = re.compile(rb'(\d{2,5})[^0-9]')
+
+# Common weight patterns from different weighbridge models, tried in order. A number with a
+# unit wins over the first bare number; any line with a digit matches the bare pattern, so a
+# separate "number at end of string" pattern could never be reached and is not kept
+_FALLBACK_RES = tuple(re.compile(pattern) for pattern in (
+    rb'(\d+\.?\d*)\s*(?:kg|KG)',  # "1234.5 kg", "1234 KG"
+    rb'(\d+\.?\d*)',              # Just the number
+))
+
+# Custom patterns run on every serial line, so reject ones that can backtrack catastrophically:
+# overly long patterns and a repeat whose body holds an unbounded repeat, e.g. "(a+)+" or "(\w+\s?)+"
+MAX_CUSTOM_PATTERN_LENGTH = 256
+_REPEAT_OPS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+
+
+def _subpatterns(av):
+    """Yield the parsed subpatterns nested anywhere in a regex node's arguments"""
+    if isinstance(av, _sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (tuple, list)):
+        for item in av:
+            yield from _subpatterns(item)
+
+
+def _has_unbounded_repeat(subpattern):
+    """True if the parsed pattern contains a *, + or {n,} repeat at any depth"""
+    for op, av in subpattern:
+        if op in _REPEAT_OPS and av[1] == _sre_parse.MAXREPEAT:
+            return True
+        if any(_has_unbounded_repeat(child) for child in _subpatterns(av)):
+            return True
+    return False
+
+
+def _has_nested_repeat(subpattern):
+    """True if a repeat that can run more than once wraps an unbounded repeat
+    
+    Works on the parsed pattern, so quantifier characters inside a class like "[*+]+" don't count.
+    An optional "(...)?" can't multiply the ways a match is tried, so it may wrap "\\d+".
+    """
+    for op, av in subpattern:
+        if op in _REPEAT_OPS and av[1] > 1 and _has_unbounded_repeat(av[2]):
+            return True
+        if any(_has_nested_repeat(child) for child in _subpatterns(av)):
+            return True
+    return False
+
+# Per-line debug output in the parsers - off by default so the f-strings aren't built for every frame
+_DEBUG = False
+
 class WeighbridgeManager:
     """Fast weighbridge manager - optimized for custom patterns with full compatibility"""
     
@@ -35,31 +99,49 @@ class WeighbridgeManager:
         # Test mode support - REQUIRED for compatibility
         self.test_mode = False
         self.last_test_weight = 0.0
+        self._sim_bases = (5000, 12000, 18000, 25000, 30000)
         
         # Weight reading configuration - from config
-        self.last_weight = 0.0
         self.weight_tolerance = getattr(config, 'WEIGHT_TOLERANCE', 1.0)
+        # Weighbridges report whole kilograms; with a tolerance of 1 kg or more, keep weights as ints
+        # so the stability check is integer arithmetic (floor keeps |diff| <= tolerance exact for ints)
+        self.integer_weights = self.weight_tolerance >= 1
+        if self.integer_weights:
+            self.weight_tolerance = math.floor(self.weight_tolerance)
+        self.last_weight = 0 if self.integer_weights else 0.0
         self.stable_readings_required = getattr(config, 'STABLE_READINGS_REQUIRED', 3)
         self.stable_count = 0
+        # Last weight handed to weight_callback and when - on a stable plateau the same weight is
+        # re-reported at most every repeat_report_interval seconds instead of on every frame
+        self._last_reported_weight = None
+        self._last_report_ts = 0.0
+        self.repeat_report_interval = getattr(config, 'WEIGHT_REPEAT_INTERVAL', 0.25)
         
         # Connection monitoring - REQUIRED for compatibility
         self.connection_attempts = 0
         self.max_connection_attempts = 3
-        self.last_successful_read = None
+        self.last_successful_read_ts = None  # time.monotonic() of the last parsed weight
+        # get_connection_status converts the stamp to ISO text once per new read, not once per poll
+        self._cached_status_ts = None
+        self._cached_status_iso = None
         self.consecutive_errors = 0
         self.max_consecutive_errors = 3
         self.reconnect_delay = 2.0
         
-        # FAST: Pre-compile only the colon pattern
-        self.colon_pattern = re.compile(r':(\d+)')
-        
-        # FIXED: Initialize weight_pattern to None
-        self.weight_pattern = None
+        # Bytes read from the port fd that do not yet form a complete frame (Linux fast path)
+        self._rx_buffer = bytearray()
         
         # Custom regex pattern support
         self.custom_regex_pattern = None
         self.use_custom_pattern = False
         
+        # Bumped whenever reader settings change; the reader thread re-binds its locals when it moves.
+        # Bump it after changing weight_tolerance, stable_readings_required or weight_callback at runtime
+        self._settings_version = 0
+        
+        # _parse_weight is bound per instance to _parse_weight_fast or _parse_weight_custom
+        self._update_parse_dispatch()
+        
         # Register signal handlers for graceful shutdown
         self._register_signal_handlers()
 
@@ -73,6 +155,18 @@ class WeighbridgeManager:
             if pattern_string and pattern_string.strip():
                 # Compile the pattern to validate it
                 compiled_pattern = re.compile(pattern_string)
+                
+                if len(pattern_string) > MAX_CUSTOM_PATTERN_LENGTH:
+                    self.logger.print_error(
+                        f"Regex pattern rejected: longer than {MAX_CUSTOM_PATTERN_LENGTH} characters")
+                    self.use_custom_pattern = False
+                    return
+                if _has_nested_repeat(_sre_parse.parse(pattern_string)):
+                    self.logger.print_error(
+                        f"Regex pattern rejected: nested repetition can hang the reader '{pattern_string}'")
+                    self.use_custom_pattern = False
+                    return
+                
                 self.custom_regex_pattern = compiled_pattern
                 self.use_custom_pattern = True
                 self.logger.print_success(f"Custom regex pattern updated: {pattern_string}")
@@ -84,6 +178,10 @@ class WeighbridgeManager:
         except re.error as e:
             self.logger.print_error(f"Invalid regex pattern '{pattern_string}': {e}")
             self.use_custom_pattern = False
+        finally:
+            # Every outcome (including a rejected pattern) re-selects the parser and tells the reader thread
+            self._update_parse_dispatch()
+            self._settings_version += 1
 
     def load_settings_and_apply_regex(self, settings_storage):
         """Load regex pattern from settings and apply it
@@ -142,6 +240,7 @@ class WeighbridgeManager:
     def set_test_mode(self, enabled):
         """Set test mode - REQUIRED method for compatibility"""
         self.test_mode = enabled
+        self._settings_version += 1
         
         if enabled:
             # Disconnect real weighbridge if connected
@@ -156,56 +255,92 @@ class WeighbridgeManager:
         except Exception as e:
             return []
     
-    def _parse_weight(self, data_line):
+    def _update_parse_dispatch(self):
+        """Point _parse_weight at the parser for the current pattern setting
+        
+        The choice is made once here, when the setting changes, instead of on every serial line.
+        """
+        if self.use_custom_pattern and self.custom_regex_pattern:
+            self._parse_weight = self._parse_weight_custom
+        else:
+            self._parse_weight = self._parse_weight_fast
+    
+    def _parse_weight_custom(self, data_line):
         """FIXED: Parse weight from received data with custom regex pattern support
         
+        Tries the custom pattern first, then the built-in formats of _parse_weight_fast.
+        
         Args:
-            data_line: Raw data string from weighbridge
+            data_line: Raw data bytes from weighbridge (str is accepted too)
             
         Returns:
             float: Parsed weight in kg, or None if parsing failed
         """
         try:
-            # FIRST: Try custom regex pattern if enabled
-            if self.use_custom_pattern and self.custom_regex_pattern:
-                match = self.custom_regex_pattern.search(data_line)
-                if match:
-                    # Get the first non-None group
-                    for group in match.groups():
-                        if group:
-                            weight = float(group)
+            if isinstance(data_line, str):
+                data_line = data_line.encode('utf-8')
+            
+            # Custom patterns are text (they may contain symbols like ☻♥), so only this path decodes
+            match = self.custom_regex_pattern.search(data_line.decode('utf-8', errors='ignore'))
+            if match:
+                # Get the first non-None group
+                for group in match.groups():
+                    if group:
+                        weight = float(group)
+                        if _DEBUG:
                             self.logger.print_debug(f"Parsed weight: {weight} kg using custom pattern")
-                            return weight
+                        return weight
+            
+        except ValueError as e:
+            self.logger.print_warning(f"Could not convert weight to float: {e}")
+            return None
+        except Exception as e:
+            self.logger.print_error(f"Error parsing weight: {e}")
+            return None
+        
+        return self._parse_weight_fast(data_line)
+    
+    def _parse_weight_fast(self, data_line):
+        """Parse weight from received data using the built-in weighbridge formats
+        
+        Args:
+            data_line: Raw data bytes from weighbridge (str is accepted too)
+            
+        Returns:
+            float: Parsed weight in kg, or None if parsing failed
+        """
+        try:
+            if isinstance(data_line, str):
+                data_line = data_line.encode('utf-8')
+            
+            # FAST PATH: bare "12345" / "1234.5" frames need no regex - the fallbacks below
+            # would return the whole line for these anyway
+            if data_line.isdigit() or (data_line[:1].isdigit() and data_line.count(b'.') == 1
+                                       and data_line.replace(b'.', b'', 1).isdigit()):
+                return float(data_line)
             
             # FALLBACK: Use individual patterns directly
             # Check for the new "Wt:" format first (e.g., "1600Wt:    1500Wt:    1500Wt:")
-            wt_pattern = r'^(\d{2,5})[^0-9]+.*Wt:$'
-            wt_matches = re.findall(wt_pattern, data_line)
-            
-            if wt_matches:
-                # Found weights in "NumberWt:" format
-                weights = [int(match) for match in wt_matches]
-                weight = weights[0]
-                self.logger.print_debug(f"Selected weight from Wt: format: {weight} kg")
-                return float(weight)
+            if data_line.endswith(b'Wt:'):
+                wt_match = _WT_PREFIX_RE.match(data_line)
+                # The trailing "Wt:" must come after the separator that follows the leading weight
+                if wt_match and len(data_line) - 3 >= wt_match.end():
+                    weight = float(wt_match.group(1))
+                    if _DEBUG:
+                        self.logger.print_debug(f"Selected weight from Wt: format: {weight:.0f} kg")
+                    return weight
             
             # Common weight patterns from different weighbridge models (existing patterns)
-            patterns = [
-                r'(\d+\.?\d*)\s*kg',  # "1234.5 kg" or "1234 kg"
-                r'(\d+\.?\d*)\s*KG',  # "1234.5 KG"
-                r'(\d+\.?\d*)',       # Just the number
-                r'.*?(\d+\.?\d*)\s*$',# Number at end of string
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, data_line)
+            for pattern in _FALLBACK_RES:
+                match = pattern.search(data_line)
                 if match:
                     weight_str = match.group(1)
                     weight = float(weight_str)
-                    self.logger.print_debug(f"Parsed weight: {weight} kg from fallback pattern: {pattern}")
+                    if _DEBUG:
+                        self.logger.print_debug(f"Parsed weight: {weight} kg from fallback pattern: {pattern.pattern}")
                     return weight
             
-            self.logger.print_warning(f"No weight pattern matched for data: '{data_line}'")
+            self.logger.print_warning(f"No weight pattern matched for data: '{data_line.decode('utf-8', errors='replace')}'")
             return None
             
         except ValueError as e:
@@ -275,7 +410,7 @@ class WeighbridgeManager:
                 bytesize=data_bits,
                 parity=parity_setting,
                 stopbits=stop_bits,
-                timeout=0.02,  # Very short timeout
+                timeout=0.5,  # Reader blocks until a frame arrives, at most 0.5s
                 write_timeout=1.0,
                 exclusive=True
             )
@@ -284,6 +419,7 @@ class WeighbridgeManager:
                 # Quick buffer clear
                 self.serial_connection.reset_input_buffer()
                 self.serial_connection.reset_output_buffer()
+                self._rx_buffer.clear()
                 
                 # Reset counters
                 self.consecutive_errors = 0
@@ -295,7 +431,7 @@ class WeighbridgeManager:
                 
                 self.is_connected = True
                 self.connection_attempts = 0
-                self.last_successful_read = datetime.datetime.now()
+                self.last_successful_read_ts = time.monotonic()
                 
                 self.logger.print_success(f"Connected to weighbridge on {port}")
                 return True
@@ -342,54 +478,170 @@ class WeighbridgeManager:
         except Exception as e:
             self.logger.print_error(f"Error starting test mode thread: {e}")
     
+    def _make_fd_frame_reader(self, ser):
+        """Read frames straight from a POSIX port's file descriptor
+        
+        pyserial's read_until() costs a select() and os.read() per byte. This reads up to 4 KiB
+        per wake-up and splits frames in-process, with the same semantics: each call blocks up to the
+        port timeout and returns whatever arrived (possibly a partial frame) when that expires.
+        
+        Returns:
+            callable: read_frame(terminator) -> bytes, or None when the port has no usable fd
+        """
+        fd = getattr(ser, 'fd', None)
+        if not sys.platform.startswith('linux') or not isinstance(fd, int):
+            return None
+        
+        # Keep pyserial's cancel_read() working by also waking on its abort pipe
+        abort_fd = getattr(ser, 'pipe_abort_read_r', None)
+        wait_fds = [fd] if abort_fd is None else [fd, abort_fd]
+        timeout = ser.timeout
+        pending = self._rx_buffer
+        monotonic = time.monotonic
+        
+        def read_frame(terminator):
+            # One deadline per call, like pyserial's Timeout - a stream that never sends the
+            # terminator must still come back after the port timeout instead of buffering forever
+            deadline = None if timeout is None else monotonic() + timeout
+            while True:
+                end = pending.find(terminator)
+                if end >= 0:
+                    end += len(terminator)
+                    frame = bytes(pending[:end])
+                    del pending[:end]
+                    return frame
+                
+                if deadline is None:
+                    remaining = None
+                else:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        frame = bytes(pending)
+                        pending.clear()
+                        return frame
+                
+                ready, _, _ = select.select(wait_fds, [], [], remaining)
+                if fd not in ready:
+                    if abort_fd in ready:
+                        os.read(abort_fd, 1000)
+                    # Timeout or cancel - hand back the partial frame like read_until() does
+                    frame = bytes(pending)
+                    pending.clear()
+                    return frame
+                
+                try:
+                    chunk = os.read(fd, 4096)
+                except OSError as e:
+                    if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                        continue
+                    raise serial.SerialException(f"read failed: {e}")
+                if not chunk:
+                    # Disconnected devices stay readable but return nothing
+                    raise serial.SerialException("device reports readiness to read but returned no data")
+                pending.extend(chunk)
+        
+        return read_frame
+    
+    def _build_fused_reader(self):
+        """Build the reader's per-frame step: read, parse, stability check and callback in one frame
+        
+        The returned closure captures the port, parser and current settings as cell variables;
+        _read_weight_loop rebuilds it whenever _settings_version changes.
+        """
+        ser = self.serial_connection
+        read_frame = None
+        if ser is not None:
+            read_frame = self._make_fd_frame_reader(ser) or ser.read_until
+        parse = self._parse_weight
+        # Bare digit frames may skip _parse_weight unless a custom pattern must get the first look
+        digits_fast_path = not (self.use_custom_pattern and self.custom_regex_pattern)
+        tolerance = self.weight_tolerance
+        readings_required = self.stable_readings_required
+        callback = self.weight_callback
+        integer_weights = self.integer_weights
+        repeat_interval = self.repeat_report_interval
+        monotonic = time.monotonic
+        
+        def read_frame_and_process():
+            if ser is None or not ser.is_open:
+                # No open port to block on
+                time.sleep(0.1)
+                return
+            
+            # Blocking read - the kernel wakes us when a frame is complete (or after the
+            # 0.5s port timeout), so there is no in_waiting polling or sleep
+            line = read_frame(b'\n').strip()
+            if not line:
+                return
+            
+            if digits_fast_path and line.isdigit():
+                weight = float(line)
+            else:
+                # FIXED: Use the full _parse_weight method that supports custom patterns
+                weight = parse(line)
+                if weight is None:
+                    return
+            
+            now = monotonic()
+            # _process_weight, inlined on the captured settings
+            if 0.0 <= weight <= 100000.0:
+                if integer_weights:
+                    weight = round(weight)
+                if abs(weight - self.last_weight) <= tolerance:
+                    stable_count = self.stable_count + 1
+                else:
+                    stable_count = 0
+                    self._last_reported_weight = None
+                self.stable_count = stable_count
+                self.last_weight = weight
+                
+                if (callback is not None and stable_count >= readings_required
+                        and (weight != self._last_reported_weight
+                             or now - self._last_report_ts >= repeat_interval)):
+                    self._last_reported_weight = weight
+                    self._last_report_ts = now
+                    try:
+                        callback(weight)
+                    except Exception as e:
+                        pass  # A failing UI callback must not stop the reader thread
+            
+            self.consecutive_errors = 0
+            self.last_successful_read_ts = now
+        
+        return read_frame_and_process
+    
     def _read_weight_loop(self):
         """FIXED: Weight reading loop that properly handles custom patterns"""
+        read_frame_and_process = None
+        version = None
+        # Report the first stable weight of this session even if it equals the last one seen
+        self._last_reported_weight = None
+        
         while self.should_read:
+            if self.test_mode:
+                # Test mode simulation - REQUIRED for compatibility
+                self._simulate_test_weight()
+                time.sleep(0.5)
+                continue
+            
+            if version != self._settings_version:
+                version = self._settings_version
+                read_frame_and_process = self._build_fused_reader()
+            
+            # Parsing and the weight callback handle their own errors, so only port I/O is caught
             try:
-                if self.test_mode:
-                    # Test mode simulation - REQUIRED for compatibility
-                    self._simulate_test_weight()
-                    time.sleep(0.5)
-                    continue
-                
-                if self.serial_connection and self.serial_connection.is_open:
-                    if self.serial_connection.in_waiting > 0:
-                        try:
-                            # Quick read and decode
-                            line = self.serial_connection.readline().decode('utf-8', errors='ignore').strip()
-                            
-                            if line:
-                                # FIXED: Use the full _parse_weight method that supports custom patterns
-                                weight = self._parse_weight(line)
-                                
-                                if weight is not None:
-                                    self._process_weight(weight)
-                                    self.consecutive_errors = 0
-                                    self.last_successful_read = datetime.datetime.now()
-                        
-                        except serial.SerialException as e:
-                            self.consecutive_errors += 1
-                            if self.consecutive_errors >= self.max_consecutive_errors:
-                                break
-                            time.sleep(self.reconnect_delay)
-                            continue
-                
-                # Minimal delay
-                time.sleep(0.005)  # 5ms delay for maximum speed
-                
-            except Exception as e:
+                read_frame_and_process()
+            except (serial.SerialException, OSError) as e:
                 self.consecutive_errors += 1
                 if self.consecutive_errors >= self.max_consecutive_errors:
                     break
-                time.sleep(0.01)
+                time.sleep(self.reconnect_delay)
     
     def _simulate_test_weight(self):
         """Test mode simulation - REQUIRED for compatibility"""
         try:
-            import random
-            base_weights = [5000, 12000, 18000, 25000, 30000]
-            selected_base = random.choice(base_weights)
-            variation = random.uniform(-100, 100)
+            selected_base = random.choice(self._sim_bases)
+            variation = random.random() * 200.0 - 100.0
             
             simulated_weight = selected_base + variation
             self.last_test_weight = simulated_weight
@@ -400,26 +652,33 @@ class WeighbridgeManager:
     
     def _process_weight(self, weight):
         """Process weight with stability checking - REQUIRED for compatibility"""
-        try:
-            # Range check
-            if weight < 0 or weight > 100000:
+        # Range check - weights come from float() so the arithmetic below cannot raise
+        if not (0.0 <= weight <= 100000.0):
+            return
+        if self.integer_weights:
+            weight = round(weight)
+        
+        # Stability check
+        if abs(weight - self.last_weight) <= self.weight_tolerance:
+            self.stable_count += 1
+        else:
+            self.stable_count = 0
+            self._last_reported_weight = None
+        
+        self.last_weight = weight
+        
+        # Only report stable weights - REQUIRED for compatibility; repeats of the reported one are rate limited
+        callback = self.weight_callback
+        if callback is not None and self.stable_count >= self.stable_readings_required:
+            now = time.monotonic()
+            if weight == self._last_reported_weight and now - self._last_report_ts < self.repeat_report_interval:
                 return
-            
-            # Stability check
-            if abs(weight - self.last_weight) <= self.weight_tolerance:
-                self.stable_count += 1
-            else:
-                self.stable_count = 0
-            
-            self.last_weight = weight
-            
-            # Only report stable weights - REQUIRED for compatibility
-            if self.stable_count >= self.stable_readings_required:
-                if self.weight_callback:
-                    self.weight_callback(weight)
-                    
-        except Exception as e:
-            pass  # Silent for speed
+            self._last_reported_weight = weight
+            self._last_report_ts = now
+            try:
+                callback(weight)
+            except Exception as e:
+                pass  # A failing UI callback must not stop the reader thread
     
     def disconnect(self):
         """Disconnect - REQUIRED method for compatibility"""
@@ -456,6 +715,17 @@ class WeighbridgeManager:
     def get_connection_status(self):
         """Get connection status - REQUIRED method for compatibility"""
         try:
+            # The reader only stores a cheap monotonic stamp; convert it to wall-clock time here
+            last_read_ts = self.last_successful_read_ts
+            if last_read_ts != self._cached_status_ts:
+                if last_read_ts is None:
+                    self._cached_status_iso = None
+                else:
+                    age = time.monotonic() - last_read_ts
+                    self._cached_status_iso = datetime.datetime.fromtimestamp(time.time() - age).isoformat()
+                self._cached_status_ts = last_read_ts
+            last_read_iso = self._cached_status_iso
+            
             status = {
                 'connected': self.is_connected,
                 'test_mode': self.test_mode,
@@ -464,7 +734,7 @@ class WeighbridgeManager:
                 'stable_count': self.stable_count,
                 'connection_attempts': self.connection_attempts,
                 'consecutive_errors': self.consecutive_errors,
-                'last_successful_read': self.last_successful_read.isoformat() if self.last_successful_read else None
+                'last_successful_read': last_read_iso
             }
             return status
         except Exception as e: